@@ -3,6 +3,8 @@ from GameTreeNode import GameTreeNode
 from config import offset_map, opposite_map, get_offset, is_adjacent
 
 class Action:
+  __slots__ = ("act_type", "end_state")
+
   def __init__(self,
                act_type:str,
                end_state:GameTreeNode):
@@ -21,27 +23,15 @@ class Action:
   def is_legal(self, world:WorldModel, current_pos):
     new_pos = self.end_state.pos
 
-    try:
-      # check if the proposed move is vaccuuming
-      if self.act_type == "V" and get_offset(current_pos, new_pos) == (0, 0):
-        if not world.is_dirty(new_pos):
-          print(f"Cannot vacuum a clean cell at {new_pos}.")
-          return False
-        else:
-          return True
-      # check adjacency
-      if not is_adjacent(current_pos, new_pos):
-        return False
-      # check if the row idx is OOB
-      if new_pos[0] < 0 or new_pos[0] >= world.num_rows:
-        return False
-      # check if the row idx is OOB
-      if new_pos[1] < 0 or new_pos[1] >= world.num_cols:
-        return False
-      # check for obstacles
-      if world.grid[new_pos[0]][new_pos[1]] == "#":
+    # check if the proposed move is vaccuuming
+    if self.act_type == "V" and get_offset(current_pos, new_pos) == (0, 0):
+      if not world.is_dirty(new_pos):
+        print(f"Cannot vacuum a clean cell at {new_pos}.")
         return False
-      return True
-    
-    except IndexError:
-      raise ValueError(f"Proposed position is OOB: {new_pos}.\nWorld size: {world.num_rows}x{world.num_cols}.")
\ No newline at end of file
+      else:
+        return True
+    # check adjacency
+    if not is_adjacent(current_pos, new_pos):
+      return False
+    # check bounds and obstacles against the world's obstacle mask
+    return world.is_open(new_pos)
\ No newline at end of file
@@ -1,15 +1,18 @@
 from WorldModel import WorldModel
 from GameTreeNode import GameTreeNode
 from Action import Action
+from AgentPath import AgentPath
 from config import offset_map, opposite_map, get_offset, is_adjacent
 
 class Agent:
+  __slots__ = ("path", "pos", "world", "tree_node", "nodes_generated", "nodes_expanded")
+
   def __init__(self,
                world: WorldModel,
                initial_pos: tuple[int, int]):
     # vars for tracking position within game tree for DFS and UCS
-    self.path = list()
-    self.move_seq = list()
+    # the path records every executed action, and the cells they left
+    self.path = AgentPath(world.num_rows, world.num_cols)
     self.pos = initial_pos
 
     self.world = world
@@ -18,6 +21,27 @@ class Agent:
     self.nodes_expanded = 0
 
 
+  @property
+  def move_seq(self) -> list[str]:
+    return self.path.get_move_seq()
+
+
+  def branch(self) -> "Agent":
+    """
+    Make a copy of this agent that can move independently.
+    The copy shares the path so far instead of deep-copying it. It also shares the world,
+    so vacuuming in one branch cleans the cell for every branch.
+    """
+    other = Agent.__new__(Agent)
+    other.path = self.path
+    other.pos = self.pos
+    other.world = self.world
+    other.tree_node = self.tree_node
+    other.nodes_generated = self.nodes_generated
+    other.nodes_expanded = self.nodes_expanded
+    return other
+
+
   def __lt__(self, other: "Agent"):
     return len(self.path) < len(other.path)
   
@@ -40,19 +64,12 @@ class Agent:
     """
 
     self.nodes_expanded += 1
-    # create a list of possible moves
-    possible_moves = {
-        move: self.get_move_pos(move)
-        for move in offset_map.keys()
-    }
-    # filter it down to a list of legal moves
-    for move, new_pos in possible_moves.items():
-      proposed_move = Action(move, GameTreeNode(new_pos))
-      # check if the move is legal and not already visited
-      if proposed_move.is_legal(self.world, self.pos)\
-        and proposed_move.end_state.pos not in self.path:
+    # the world's neighbor table only lists legal moves, so no throwaway actions get built
+    for move, new_pos in self.world.get_neighbor_table().get_neighbors(self.pos):
+      # check if the move is not already visited
+      if new_pos not in self.path:
         # give the child a reference to the parent node
-        proposed_move.end_state.parent = Action(opposite_map[move], self.tree_node)
+        proposed_move = Action(move, GameTreeNode(new_pos, parent=Action(opposite_map[move], self.tree_node)))
         # add the proposed move to the set of available actions
         self.tree_node.available_acts.append(proposed_move)
         self.nodes_generated += 1
@@ -87,16 +104,16 @@ class Agent:
     if action.act_type not in offset_map and action.act_type != "V":
       raise ValueError("Invalid action type")
     
-    self.move_seq.append(action.act_type)
     # if the action is vacuuming, check if the cell is dirty
     # and update the world model accordingly
     if action.act_type == "V":
         self.world.remove_dirty_cell(self.pos)
+        self.path = self.path.push(action.act_type)
     
     # if the action is a move, update the agent's set of visited nodes and position
     else:
         # add the current node to the set of visited nodes
-        self.path.append(self.pos)
+        self.path = self.path.push(action.act_type, self.pos)
         # update the agent's position
         self.pos = action.end_state.pos
         # update the world model
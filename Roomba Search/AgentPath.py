@@ -0,0 +1,95 @@
+# children per node of the visited-cell trie
+BRANCHING = 32
+BRANCH_BITS = 5
+
+def trie_add(node: tuple | None, cell: int, depth: int) -> tuple | bool:
+    """
+    Add a cell id to a persistent trie of the given depth, returning the new root.
+    Only the depth nodes along the cell's path are copied; every other subtree is shared with the old trie.
+    """
+    if depth == 0:
+        return True
+    children = list(node) if node is not None else [None] * BRANCHING
+    index = cell >> (BRANCH_BITS * (depth - 1)) & (BRANCHING - 1)
+    children[index] = trie_add(children[index], cell, depth - 1)
+    return tuple(children)
+
+def trie_contains(node: tuple | None, cell: int, depth: int) -> bool:
+    for level in range(depth - 1, -1, -1):
+        if node is None:
+            return False
+        node = node[cell >> (BRANCH_BITS * level) & (BRANCHING - 1)]
+    return node is True
+
+
+class AgentPath:
+    """
+    Persistent linked list of the actions an agent has executed.
+
+    Pushing an action returns a new AgentPath whose parent is the old one, so agents that
+    branch off the same prefix share it instead of copying it. Each node also carries a
+    persistent trie of the cells left so far, keyed by row * num_cols + col. Its depth only
+    grows with the log of the map's size, so pushes and membership checks take O(1) steps,
+    and a push copies a few small nodes instead of the whole set.
+    """
+    __slots__ = ("num_rows", "num_cols", "depth", "move", "pos", "parent", "length", "visited")
+
+    def __init__(self,
+                 num_rows: int,
+                 num_cols: int,
+                 move: str = None,
+                 pos: tuple[int, int] = None,
+                 parent: "AgentPath" = None):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        # the action taken, and the cell it left (None for vacuuming, which doesn't move)
+        self.move = move
+        self.pos = pos
+        self.parent = parent
+
+        # length counts the cells left, like the list of visited positions this replaces
+        self.length = parent.length if parent is not None else 0
+        self.visited = parent.visited if parent is not None else None
+        if parent is not None:
+            self.depth = parent.depth
+        else:
+            # enough levels for every cell id to have its own leaf
+            self.depth = 1
+            while BRANCHING ** self.depth < num_rows * num_cols:
+                self.depth += 1
+        if pos is not None:
+            self.length += 1
+            if pos not in self:
+                self.visited = trie_add(self.visited, pos[0] * num_cols + pos[1], self.depth)
+
+    def push(self,
+             move: str,
+             pos: tuple[int, int] = None) -> "AgentPath":
+        return AgentPath(self.num_rows, self.num_cols, move, pos, self)
+
+    def __len__(self):
+        return self.length
+
+    def __contains__(self, pos: tuple[int, int]) -> bool:
+        if not (0 <= pos[0] < self.num_rows and 0 <= pos[1] < self.num_cols):
+            return False
+        return trie_contains(self.visited, pos[0] * self.num_cols + pos[1], self.depth)
+
+    def nodes(self) -> list["AgentPath"]:
+        """
+        Get the nodes of the path from the oldest action to the newest.
+        """
+        nodes = list()
+        node = self
+        while node.parent is not None:
+            nodes.append(node)
+            node = node.parent
+        nodes.reverse()
+        return nodes
+
+    def __iter__(self):
+        # iterate over the cells left, oldest first, like the old list of positions
+        return (node.pos for node in self.nodes() if node.pos is not None)
+
+    def get_move_seq(self) -> list[str]:
+        return [node.move for node in self.nodes()]
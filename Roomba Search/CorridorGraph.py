@@ -0,0 +1,81 @@
+from collections import OrderedDict
+import numpy as np
+
+from WorldModel import WorldModel
+
+class CorridorGraph:
+    """
+    A world's open cells contracted into a sparse weighted graph.
+
+    Cells with exactly two open neighbors are corridor cells: a robot walking down a corridor has
+    no choice to make until it reaches the other end. Every other open cell, every dirty cell and
+    every robot is a node, and each chain of corridor cells between two nodes becomes one edge,
+    weighted by its length and labeled with the moves along it. Dead ends without dirt or a robot
+    are pruned away, since no plan ever needs to enter them.
+    Graphs are cached by grid hash, like DistanceOracle.
+    """
+    # grid hash -> graph, least recently used first
+    cache: OrderedDict[str, "CorridorGraph"] = OrderedDict()
+    max_cached_worlds = 32
+
+    def __init__(self, world: WorldModel):
+        neighbor_table = world.get_neighbor_table()
+        # every cell's number of open neighbors, read off the neighbor table's offsets
+        degrees = np.diff(np.array(neighbor_table.offsets)).reshape(world.num_rows, world.num_cols)
+        is_node = ~world.obstacle_mask & (degrees != 2)
+        for pos in list(world.dirty_cells) + world.grid.find("@"):
+            is_node[pos] = True
+        self.nodes: set[tuple[int, int]] = set(zip(*(axis.tolist() for axis in np.nonzero(is_node))))
+
+        # node -> {neighboring node: (number of moves, moves along the shortest chain between them)}
+        self.edges: dict[tuple[int, int], dict[tuple[int, int], tuple[int, str]]] = dict()
+        for node in self.nodes:
+            edges = self.edges.setdefault(node, dict())
+            for first_move, pos in neighbor_table.get_neighbors(node):
+                moves = [first_move]
+                prev = node
+                # follow the corridor until it reaches another node
+                while pos not in self.nodes:
+                    move, next_pos = next(
+                        (move, next_pos) for move, next_pos in neighbor_table.get_neighbors(pos) if next_pos != prev
+                    )
+                    moves.append(move)
+                    prev, pos = pos, next_pos
+                # loops back to the same node are never worth walking
+                if pos != node and (pos not in edges or len(moves) < edges[pos][0]):
+                    edges[pos] = (len(moves), "".join(moves))
+
+        self.prune_dead_ends(set(world.dirty_cells) | set(world.grid.find("@")))
+
+    @classmethod
+    def for_world(cls, world: WorldModel) -> "CorridorGraph":
+        """
+        Get the graph for a world, building it only if the same map hasn't been seen recently.
+        """
+        grid_hash = world.get_grid_hash()
+        if grid_hash in cls.cache:
+            cls.cache.move_to_end(grid_hash)
+        else:
+            cls.cache[grid_hash] = cls(world)
+            if len(cls.cache) > cls.max_cached_worlds:
+                cls.cache.popitem(last=False)
+        return cls.cache[grid_hash]
+
+    def prune_dead_ends(self, keep: set[tuple[int, int]]):
+        """
+        Repeatedly remove nodes with at most one neighbor, unless they're in keep.
+        """
+        dead_ends = [node for node, edges in self.edges.items() if len(edges) <= 1 and node not in keep]
+        while dead_ends:
+            node = dead_ends.pop()
+            if node not in self.edges:
+                continue
+            for neighbor in self.edges.pop(node):
+                neighbor_edges = self.edges[neighbor]
+                del neighbor_edges[node]
+                if len(neighbor_edges) <= 1 and neighbor not in keep:
+                    dead_ends.append(neighbor)
+            self.nodes.discard(node)
+
+    def get_edges(self, pos: tuple[int, int]) -> dict[tuple[int, int], tuple[int, str]]:
+        return self.edges[pos]
@@ -0,0 +1,105 @@
+from collections import OrderedDict, deque
+
+from WorldModel import WorldModel
+from config import move_map, opposite_map, get_offset
+
+class DistanceOracle:
+    """
+    Shortest-path distances between the robot's start and every dirty cell of a world.
+
+    One BFS is run from each of those cells, and its distance field and predecessor tree
+    are kept, so the distance from any cell to the start or to a dirty cell is a dict lookup.
+    Oracles are cached by the world's grid hash, so planning on the same map reuses them.
+    """
+    # grid hash -> oracle, least recently used first
+    cache: OrderedDict[str, "DistanceOracle"] = OrderedDict()
+    max_cached_worlds = 32
+
+    def __init__(self, world: WorldModel):
+        self.start = world.get_bot_pos_from_grid()
+        self.dirt_cells = sorted(world.dirty_cells)
+        # the start is source 0, dirty cell i is source i + 1
+        self.sources = [self.start] + self.dirt_cells
+
+        # source -> {cell: distance to the source}
+        self.distance_fields: dict[tuple[int, int], dict[tuple[int, int], int]] = dict()
+        # source -> {cell: next cell on a shortest path to the source}
+        self.predecessors: dict[tuple[int, int], dict[tuple[int, int], tuple[int, int]]] = dict()
+        for source in self.sources:
+            if source not in self.distance_fields:
+                self.distance_fields[source], self.predecessors[source] = self.bfs(world, source)
+
+        # pairwise distances between the sources, by source index
+        self.matrix = [
+            [self.distance(pos1, pos2) for pos2 in self.sources]
+            for pos1 in self.sources
+        ]
+
+    @classmethod
+    def for_world(cls, world: WorldModel) -> "DistanceOracle":
+        """
+        Get the oracle for a world, building it only if the same map hasn't been seen recently.
+        """
+        grid_hash = world.get_grid_hash()
+        if grid_hash in cls.cache:
+            cls.cache.move_to_end(grid_hash)
+        else:
+            cls.cache[grid_hash] = cls(world)
+            if len(cls.cache) > cls.max_cached_worlds:
+                cls.cache.popitem(last=False)
+        return cls.cache[grid_hash]
+
+    @staticmethod
+    def bfs(world: WorldModel,
+            source: tuple[int, int]) -> tuple[dict[tuple[int, int], int], dict[tuple[int, int], tuple[int, int]]]:
+        neighbor_table = world.get_neighbor_table()
+        distances = {source: 0}
+        predecessors = dict()
+        queue = deque([source])
+        while queue:
+            pos = queue.popleft()
+            for _, new_pos in neighbor_table.get_neighbors(pos):
+                if new_pos not in distances:
+                    distances[new_pos] = distances[pos] + 1
+                    predecessors[new_pos] = pos
+                    queue.append(new_pos)
+        return distances, predecessors
+
+    def distance(self,
+                 pos1: tuple[int, int],
+                 pos2: tuple[int, int]) -> int | float:
+        """
+        Get the number of moves between two cells, one of which must be the start or a dirty cell.
+        Unreachable cells are infinitely far apart.
+        """
+        if pos2 in self.distance_fields:
+            return self.distance_fields[pos2].get(pos1, float("inf"))
+        if pos1 in self.distance_fields:
+            return self.distance_fields[pos1].get(pos2, float("inf"))
+        raise ValueError(f"Neither {pos1} nor {pos2} is the start or a dirty cell.")
+
+    def get_path(self,
+                 pos1: tuple[int, int],
+                 pos2: tuple[int, int]) -> list[str]:
+        """
+        Get the moves along a shortest path from pos1 to pos2, one of which must be the start or a dirty cell.
+        """
+        if pos2 in self.predecessors:
+            return self.walk_to_source(pos1, pos2)
+        if pos1 in self.predecessors:
+            # walk the path backwards, then undo each move
+            return [opposite_map[move] for move in reversed(self.walk_to_source(pos2, pos1))]
+        raise ValueError(f"Neither {pos1} nor {pos2} is the start or a dirty cell.")
+
+    def walk_to_source(self,
+                       pos: tuple[int, int],
+                       source: tuple[int, int]) -> list[str]:
+        predecessors = self.predecessors[source]
+        if pos != source and pos not in predecessors:
+            raise ValueError(f"No path from {pos} to {source}.")
+        moves = list()
+        while pos != source:
+            next_pos = predecessors[pos]
+            moves.append(move_map[get_offset(pos, next_pos)])
+            pos = next_pos
+        return moves
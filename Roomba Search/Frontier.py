@@ -0,0 +1,61 @@
+from collections import deque
+from itertools import count
+import heapq as hq
+
+class HeapFrontier:
+    """
+    Priority queue of search states on a binary heap. Works with any comparable priority,
+    at O(log n) per push and pop. Equal priorities come out in the order they were pushed.
+    """
+    __slots__ = ("heap", "tie_breaker")
+
+    def __init__(self):
+        self.heap: list[tuple] = list()
+        # the counter breaks ties between equal priorities, so items never get compared directly
+        self.tie_breaker = count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, priority, item):
+        hq.heappush(self.heap, (priority, next(self.tie_breaker), item))
+
+    def pop(self):
+        return hq.heappop(self.heap)[-1]
+
+    def peek_priority(self):
+        return self.heap[0][0]
+
+
+class BucketFrontier:
+    """
+    Priority queue for small non-negative integer priorities, such as unit-cost path lengths
+    (Dial's algorithm). Each priority gets a FIFO bucket, so push and pop are O(1) amortized
+    and equal priorities come out in the order they were pushed.
+    """
+    __slots__ = ("buckets", "min_priority", "size")
+
+    def __init__(self):
+        self.buckets: list[deque] = list()
+        # no non-empty bucket comes before this one
+        self.min_priority = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, priority: int, item):
+        while len(self.buckets) <= priority:
+            self.buckets.append(deque())
+        self.buckets[priority].append(item)
+        if priority < self.min_priority:
+            self.min_priority = priority
+        self.size += 1
+
+    def pop(self):
+        if not self.size:
+            raise IndexError("pop from an empty frontier")
+        while not self.buckets[self.min_priority]:
+            self.min_priority += 1
+        self.size -= 1
+        return self.buckets[self.min_priority].popleft()
@@ -1,6 +1,9 @@
 from config import offset_map
 
 class GameTreeNode:
+  # slotted, since a search can create millions of nodes
+  __slots__ = ("pos", "parent", "available_acts")
+
   def __init__(self, pos:tuple[int, int], parent=None):
     self.pos:tuple[int, int] = pos
     self.parent = parent
@@ -0,0 +1,97 @@
+import numpy as np
+
+# cells are stored as the ASCII codes of their map characters
+EMPTY = ord("_")
+BLOCKED = ord("#")
+DIRTY = ord("*")
+ROBOT = ord("@")
+
+class Grid:
+    """
+    Array-backed vacuum-world grid.
+
+    cells holds one uint8 code per cell, with boolean obstacle and dirt masks kept alongside it,
+    so whole-grid checks can be done with array operations. grid[r][c] still reads and writes
+    single-character strings, for code written against the old list-of-lists grid.
+    """
+    def __init__(self, cells: np.ndarray):
+        self.cells = np.ascontiguousarray(cells, dtype=np.uint8)
+        self.obstacle_mask = self.cells == BLOCKED
+        self.dirt_mask = self.cells == DIRTY
+        # bumped whenever a cell becomes or stops being an obstacle, so cached tables can tell they're stale
+        self.obstacle_version = 0
+
+    @classmethod
+    def from_rows(cls, rows: list[str] | list[list[str]]) -> "Grid":
+        """
+        Build a grid from rows of map characters, which must all be the same length.
+        """
+        num_cols = len(rows[0]) if rows else 0
+        data = bytearray()
+        for i, row in enumerate(rows):
+            if len(row) != num_cols:
+                raise ValueError(f"Row {i} has {len(row)} cells, expected {num_cols}.")
+            data += "".join(row).encode("ascii")
+        return cls(np.frombuffer(data, dtype=np.uint8).reshape(len(rows), num_cols))
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.cells.shape
+
+    def __len__(self):
+        return self.cells.shape[0]
+
+    def __getitem__(self, row: int) -> "GridRow":
+        if not -len(self) <= row < len(self):
+            raise IndexError(f"Row {row} is out of range.")
+        return GridRow(self, row % len(self))
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield GridRow(self, row)
+
+    def set_cell(self, pos: tuple[int, int], char: str):
+        code = ord(char)
+        if self.obstacle_mask[pos] != (code == BLOCKED):
+            self.obstacle_version += 1
+        self.cells[pos] = code
+        self.obstacle_mask[pos] = code == BLOCKED
+        self.dirt_mask[pos] = code == DIRTY
+
+    def find(self, char: str) -> list[tuple[int, int]]:
+        """
+        Get the positions of every cell holding the given character, in row-major order.
+        """
+        rows, cols = np.nonzero(self.cells == ord(char))
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def to_rows(self) -> list[str]:
+        return [row.tobytes().decode("ascii") for row in self.cells]
+
+
+class GridRow:
+    """
+    A view of one row of a Grid, indexed by column.
+    """
+    __slots__ = ("grid", "row")
+
+    def __init__(self, grid: Grid, row: int):
+        self.grid = grid
+        self.row = row
+
+    def __len__(self):
+        return self.grid.cells.shape[1]
+
+    def __getitem__(self, col: int | slice) -> str | list[str]:
+        if isinstance(col, slice):
+            return list(self.grid.cells[self.row, col].tobytes().decode("ascii"))
+        return chr(self.grid.cells[self.row, col])
+
+    def __setitem__(self, col: int, char: str):
+        self.grid.set_cell((self.row, col), char)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __eq__(self, other):
+        return list(self) == list(other)
@@ -0,0 +1,318 @@
+from collections import OrderedDict, deque
+import heapq as hq
+import numpy as np
+
+from WorldModel import WorldModel
+from config import move_map, opposite_map, get_offset
+
+class HierarchicalMap:
+    """
+    Hierarchical path-finding (HPA*) distances for maps too big to BFS from every dirty cell.
+
+    The grid is split into square clusters. Each open stretch of border between two clusters
+    gets one entrance, a pair of cells facing each other across it. The entrances, the start and
+    the dirty cells are the nodes of an abstract graph, whose edges are the moves across entrances
+    and the shortest in-cluster paths between nodes of the same cluster, found by BFS inside the cluster.
+    Distances from every node to the start and each dirty cell are found once, with a Dijkstra
+    search of the abstract graph per source, so a query from any cell only needs a BFS of its own
+    cluster. Paths follow the abstract graph, then are refined with in-cluster BFS.
+
+    Distances are the lengths of real paths, but they can be slightly longer than the shortest ones,
+    since paths are forced through the entrances. Maps are cached by grid hash, like DistanceOracle.
+    """
+    # grid hash -> map, least recently used first
+    cache: OrderedDict[str, "HierarchicalMap"] = OrderedDict()
+    max_cached_worlds = 32
+
+    def __init__(self, world: WorldModel, cluster_size: int = 16):
+        self.cluster_size = cluster_size
+        self.neighbor_table = world.get_neighbor_table()
+        self.start = world.get_bot_pos_from_grid()
+        self.dirt_cells = sorted(world.dirty_cells)
+        # the start is source 0, dirty cell i is source i + 1
+        self.sources = [self.start] + self.dirt_cells
+        self.source_set = set(self.sources)
+
+        # cluster -> its nodes in the abstract graph
+        self.cluster_nodes: dict[tuple[int, int], list[tuple[int, int]]] = dict()
+        # node -> {neighboring node: number of moves between them}
+        self.edges: dict[tuple[int, int], dict[tuple[int, int], int]] = dict()
+        self.add_entrances(world.obstacle_mask)
+        for source in self.sources:
+            self.add_node(source)
+        self.add_cluster_edges(world.obstacle_mask)
+
+        # source -> (distance from the source to each node, next node on the way back to the source)
+        self.source_fields: dict[tuple[int, int], tuple[dict, dict]] = {
+            source: self.dijkstra(source) for source in self.source_set
+        }
+        # cell -> [(node of its cluster, in-cluster distance)], filled in as the heuristics ask about each cell
+        self.links: dict[tuple[int, int], list[tuple[tuple[int, int], int]]] = dict()
+        # pairwise distances between the sources, by source index
+        self.matrix = [
+            [self.distance(pos1, pos2) for pos2 in self.sources]
+            for pos1 in self.sources
+        ]
+
+    @classmethod
+    def for_world(cls, world: WorldModel) -> "HierarchicalMap":
+        """
+        Get the hierarchy for a world, building it only if the same map hasn't been seen recently.
+        """
+        grid_hash = world.get_grid_hash()
+        if grid_hash in cls.cache:
+            cls.cache.move_to_end(grid_hash)
+        else:
+            cls.cache[grid_hash] = cls(world)
+            if len(cls.cache) > cls.max_cached_worlds:
+                cls.cache.popitem(last=False)
+        return cls.cache[grid_hash]
+
+    def get_cluster(self, pos: tuple[int, int]) -> tuple[int, int]:
+        return pos[0] // self.cluster_size, pos[1] // self.cluster_size
+
+    def add_node(self, pos: tuple[int, int]):
+        if pos not in self.edges:
+            self.edges[pos] = dict()
+            self.cluster_nodes.setdefault(self.get_cluster(pos), list()).append(pos)
+
+    def add_entrances(self, obstacle_mask: np.ndarray):
+        """
+        Add an entrance in the middle of every open stretch of every cluster border.
+        """
+        is_open = ~obstacle_mask
+        num_rows, num_cols = obstacle_mask.shape
+        # the columns and rows just past each vertical and horizontal border
+        for vertical, num_lines, length in ((True, num_cols, num_rows), (False, num_rows, num_cols)):
+            for line in range(self.cluster_size, num_lines, self.cluster_size):
+                if vertical:
+                    crossable = is_open[:, line - 1] & is_open[:, line]
+                else:
+                    crossable = is_open[line - 1, :] & is_open[line, :]
+                # split the border where it crosses into the next pair of clusters, so no stretch spans two
+                for segment_start in range(0, length, self.cluster_size):
+                    segment = crossable[segment_start:segment_start + self.cluster_size]
+                    # stretch boundaries are where crossability flips
+                    edges = np.flatnonzero(np.diff(np.concatenate(([0], segment.astype(np.int8), [0]))))
+                    for run_start, run_end in zip(edges[0::2], edges[1::2]):
+                        mid = segment_start + (int(run_start) + int(run_end) - 1) // 2
+                        near, far = ((mid, line - 1), (mid, line)) if vertical else ((line - 1, mid), (line, mid))
+                        self.add_node(near)
+                        self.add_node(far)
+                        self.edges[near][far] = 1
+                        self.edges[far][near] = 1
+
+    def add_cluster_edges(self, obstacle_mask: np.ndarray):
+        """
+        Link the nodes of each cluster by their in-cluster distances. Rather than one BFS per node,
+        every node of a row of clusters is flooded at once, with each node's reached cells
+        kept in its own layer of one array, and each BFS level grown with array shifts.
+        """
+        size = self.cluster_size
+        num_rows, num_cols = obstacle_mask.shape
+        cluster_rows, cluster_cols = -(-num_rows // size), -(-num_cols // size)
+        # pad the grid with obstacles to whole clusters, then view it as a grid of clusters
+        is_open = np.zeros((cluster_rows * size, cluster_cols * size), dtype=bool)
+        is_open[:num_rows, :num_cols] = ~obstacle_mask
+        clusters = is_open.reshape(cluster_rows, size, cluster_cols, size).transpose(0, 2, 1, 3)
+
+        for cluster_row in range(cluster_rows):
+            row_nodes = [self.cluster_nodes.get((cluster_row, cluster_col), []) for cluster_col in range(cluster_cols)]
+            num_layers = max(map(len, row_nodes))
+            if num_layers < 2:
+                continue
+            # (cluster column, layer, local row, local column) of every node in this row of clusters
+            seeds = np.array([
+                (cluster_col, layer, row % size, col % size)
+                for cluster_col, nodes in enumerate(row_nodes)
+                for layer, (row, col) in enumerate(nodes)
+            ]).T
+            reached = np.zeros((cluster_cols, num_layers, size, size), dtype=bool)
+            distances = np.full(reached.shape, -1, dtype=np.int32)
+            reached[tuple(seeds)] = True
+            distances[tuple(seeds)] = 0
+            frontier = reached.copy()
+            row_open = clusters[cluster_row][:, None]
+            level = 0
+            while frontier.any():
+                level += 1
+                # shifting within the last two axes never spills into the next cluster
+                grown = np.zeros_like(frontier)
+                grown[..., 1:, :] |= frontier[..., :-1, :]
+                grown[..., :-1, :] |= frontier[..., 1:, :]
+                grown[..., :, 1:] |= frontier[..., :, :-1]
+                grown[..., :, :-1] |= frontier[..., :, 1:]
+                frontier = grown & row_open & ~reached
+                reached |= frontier
+                distances[frontier] = level
+
+            for cluster_col, nodes in enumerate(row_nodes):
+                if len(nodes) < 2:
+                    continue
+                local_rows = [row % size for row, _ in nodes]
+                local_cols = [col % size for _, col in nodes]
+                # pair_distances[i][j]: moves from node j to node i
+                pair_distances = distances[cluster_col, :len(nodes)][:, local_rows, local_cols].tolist()
+                for node, node_distances in zip(nodes, pair_distances):
+                    for other, dist in zip(nodes, node_distances):
+                        if dist > 0:
+                            self.edges[other][node] = dist
+
+    def local_bfs(self,
+                  source: tuple[int, int]) -> tuple[dict[tuple[int, int], int], dict[tuple[int, int], tuple[int, int]]]:
+        """
+        BFS from a cell without leaving its cluster. Returns the distance to each cell reached,
+        and the next cell on a shortest path back to the source.
+        """
+        cluster = self.get_cluster(source)
+        distances = {source: 0}
+        predecessors = dict()
+        queue = deque([source])
+        while queue:
+            pos = queue.popleft()
+            for _, new_pos in self.neighbor_table.get_neighbors(pos):
+                if new_pos not in distances and self.get_cluster(new_pos) == cluster:
+                    distances[new_pos] = distances[pos] + 1
+                    predecessors[new_pos] = pos
+                    queue.append(new_pos)
+        return distances, predecessors
+
+    def get_links(self, pos: tuple[int, int]) -> list[tuple[tuple[int, int], int]]:
+        """
+        Get the nodes of a cell's cluster it can reach without leaving the cluster, with their distances.
+        """
+        links = self.links.get(pos)
+        if links is None:
+            if pos in self.edges:
+                links = [(pos, 0)]
+            else:
+                distances, _ = self.local_bfs(pos)
+                links = [(node, distances[node]) for node in self.cluster_nodes.get(self.get_cluster(pos), ()) if node in distances]
+            self.links[pos] = links
+        return links
+
+    def dijkstra(self,
+                 source: tuple[int, int],
+                 source_edges: dict[tuple[int, int], int] | None = None,
+                 target: tuple[int, int] | None = None,
+                 target_edges: dict[tuple[int, int], int] | None = None) -> tuple[dict, dict]:
+        """
+        Dijkstra over the abstract graph, stopping early once the target is reached if one is given.
+        A source or target that isn't a node is joined to the graph by the given edges, for this search only.
+        Returns the distance to each node reached, and the node before it on the way from the source.
+        """
+        edges = self.edges
+        source_edges = source_edges if source_edges is not None else edges[source]
+        target_edges = target_edges or dict()
+        distances = {source: 0}
+        parents = dict()
+        pq = [(0, source)]
+        while pq:
+            dist, node = hq.heappop(pq)
+            if dist > distances[node]:
+                continue
+            if node == target:
+                break
+            neighbors = source_edges if node == source else edges.get(node, {})
+            if node in target_edges:
+                neighbors = {**neighbors, target: target_edges[node]}
+            for neighbor, cost in neighbors.items():
+                if dist + cost < distances.get(neighbor, float("inf")):
+                    distances[neighbor] = dist + cost
+                    parents[neighbor] = node
+                    hq.heappush(pq, (dist + cost, neighbor))
+        return distances, parents
+
+    def abstract_search(self,
+                        pos1: tuple[int, int],
+                        pos2: tuple[int, int]) -> tuple[dict, dict]:
+        """
+        Search from pos1 to pos2 when neither is the start or a dirty cell.
+        """
+        # a node links only to itself, so it leaves by its own edges instead
+        source_edges = dict(self.edges[pos1] if pos1 in self.edges else self.get_links(pos1))
+        target_edges = dict(self.get_links(pos2))
+        # two cells of the same cluster may be connected without going through any node
+        if self.get_cluster(pos1) == self.get_cluster(pos2):
+            distances, _ = self.local_bfs(pos2)
+            if pos1 in distances:
+                source_edges[pos2] = distances[pos1]
+        return self.dijkstra(pos1, source_edges, pos2, target_edges)
+
+    def get_best_link(self,
+                      pos: tuple[int, int],
+                      source: tuple[int, int]) -> tuple[int | float, tuple[int, int] | None]:
+        """
+        Get the length of the abstract path from a cell to a source, and the node it enters the graph by.
+        """
+        source_distances, _ = self.source_fields[source]
+        return min(
+            ((dist + source_distances[node], node) for node, dist in self.get_links(pos) if node in source_distances),
+            default=(float("inf"), None)
+        )
+
+    def distance(self,
+                 pos1: tuple[int, int],
+                 pos2: tuple[int, int]) -> int | float:
+        """
+        Get the number of moves on the abstract path between two cells.
+        Unreachable cells are infinitely far apart.
+        """
+        # distances to the start and dirty cells only need a look at the cell's own cluster
+        if pos2 in self.source_fields:
+            return self.get_best_link(pos1, pos2)[0]
+        if pos1 in self.source_fields:
+            return self.get_best_link(pos2, pos1)[0]
+        distances, _ = self.abstract_search(pos1, pos2)
+        return distances.get(pos2, float("inf"))
+
+    def get_path(self,
+                 pos1: tuple[int, int],
+                 pos2: tuple[int, int]) -> list[str]:
+        """
+        Get the moves along the abstract path from pos1 to pos2, refined into single steps.
+        """
+        if pos2 in self.source_fields:
+            return self.refine(self.get_waypoints_to_source(pos1, pos2))
+        if pos1 in self.source_fields:
+            # walk the path backwards, then undo each move
+            return [opposite_map[move] for move in reversed(self.get_path(pos2, pos1))]
+
+        _, parents = self.abstract_search(pos1, pos2)
+        if pos1 != pos2 and pos2 not in parents:
+            raise ValueError(f"No path from {pos1} to {pos2}.")
+        waypoints = [pos2]
+        while waypoints[-1] != pos1:
+            waypoints.append(parents[waypoints[-1]])
+        waypoints.reverse()
+        return self.refine(waypoints)
+
+    def get_waypoints_to_source(self,
+                                pos: tuple[int, int],
+                                source: tuple[int, int]) -> list[tuple[int, int]]:
+        dist, node = self.get_best_link(pos, source)
+        if dist == float("inf"):
+            raise ValueError(f"No path from {pos} to {source}.")
+        _, parents = self.source_fields[source]
+        waypoints = [pos] if pos != node else []
+        waypoints.append(node)
+        while waypoints[-1] != source:
+            waypoints.append(parents[waypoints[-1]])
+        return waypoints
+
+    def refine(self, waypoints: list[tuple[int, int]]) -> list[str]:
+        """
+        Turn a path through the abstract graph into single moves.
+        """
+        moves = list()
+        for pos, next_pos in zip(waypoints, waypoints[1:]):
+            # crossing an entrance
+            if self.get_cluster(pos) != self.get_cluster(next_pos):
+                moves.append(move_map[get_offset(pos, next_pos)])
+                continue
+            # inside a cluster, walk back along a BFS tree rooted at the next waypoint
+            _, predecessors = self.local_bfs(next_pos)
+            while pos != next_pos:
+                moves.append(move_map[get_offset(pos, predecessors[pos])])
+                pos = predecessors[pos]
+        return moves
@@ -0,0 +1,236 @@
+from collections import deque
+import heapq as hq
+import numpy as np
+
+from Grid import ROBOT
+from WorldModel import WorldModel
+from searches import get_visit_order
+from config import offset_map
+
+change_events = ("add-obstacle", "remove-obstacle", "add-dirt", "clean-dirt")
+
+class IncrementalPlanner:
+    """
+    Plans a tour of the dirty cells, and keeps the plan up to date as the world changes,
+    without replanning from scratch.
+
+    A BFS distance field is kept for each dirty cell. The grid is undirected, so a dirty cell's
+    field also gives the distance from the robot and from every other dirty cell to it.
+    When an obstacle appears or disappears, each field is repaired like in D* Lite: only the cells
+    whose distance actually changes are touched. The visiting order is only solved again when
+    the distances between the robot and the dirty cells change, and each leg of the plan is kept
+    until an obstacle lands on it or a shorter route to its end opens up.
+    """
+    def __init__(self, world: WorldModel):
+        self.world = world
+        self.robot = world.get_bot_pos_from_grid()
+        # dirty cell -> {cell: distance to the dirty cell}, unreachable cells are left out
+        self.fields: dict[tuple[int, int], dict[tuple[int, int], int]] = {
+            dirt: self.bfs(dirt) for dirt in world.dirty_cells
+        }
+        # (from, to) -> (moves along the leg, cells the leg passes through)
+        self.legs: dict[tuple[tuple[int, int], tuple[int, int]], tuple[list[str], set[tuple[int, int]]]] = dict()
+        # the last visiting order, and the distances it was solved for
+        self.order: list[tuple[int, int]] = list()
+        self.matrix: np.ndarray | None = None
+        # cells whose distance in some field was changed by a repair, for measuring repair work
+        self.cells_repaired = 0
+
+    def get_open_neighbors(self, pos: tuple[int, int]) -> list[tuple[int, int]]:
+        # the neighbor table is rebuilt from scratch whenever an obstacle changes, so it's not used here
+        return [
+            new_pos for new_pos in ((pos[0] + dr, pos[1] + dc) for dr, dc in offset_map.values())
+            if self.world.is_open(new_pos)
+        ]
+
+    def bfs(self, source: tuple[int, int]) -> dict[tuple[int, int], int]:
+        distances = {source: 0}
+        queue = deque([source])
+        while queue:
+            pos = queue.popleft()
+            for new_pos in self.get_open_neighbors(pos):
+                if new_pos not in distances:
+                    distances[new_pos] = distances[pos] + 1
+                    queue.append(new_pos)
+        return distances
+
+    def apply(self, event: str, pos: tuple[int, int]):
+        """
+        Apply one change event to the world, and repair the distance fields to match.
+        """
+        if event not in change_events:
+            raise ValueError(f"Unknown change event: {event}. Supported events: {', '.join(change_events)}.")
+
+        match event:
+            case "add-obstacle":
+                self.add_obstacle(pos)
+            case "remove-obstacle":
+                self.remove_obstacle(pos)
+            case "add-dirt":
+                self.add_dirt(pos)
+            case "clean-dirt":
+                self.remove_dirty_cell(pos)
+
+    def add_obstacle(self, pos: tuple[int, int]):
+        if not self.world.is_open(pos):
+            raise ValueError(f"Cell {pos} is already blocked or off the grid.")
+        if pos == self.robot or pos in self.fields:
+            raise ValueError(f"Cell {pos} can't be blocked while the robot or dirt is on it.")
+        self.world.grid.set_cell(pos, "#")
+        for field in self.fields.values():
+            self.repair_increase(field, pos)
+        # drop the legs the new obstacle cuts
+        self.legs = {key: leg for key, leg in self.legs.items() if pos not in leg[1]}
+
+    def remove_obstacle(self, pos: tuple[int, int]):
+        if not (0 <= pos[0] < self.world.num_rows and 0 <= pos[1] < self.world.num_cols)\
+            or self.world.is_open(pos):
+            raise ValueError(f"Cell {pos} is not blocked.")
+        self.world.grid.set_cell(pos, "_")
+        for field in self.fields.values():
+            self.repair_decrease(field, pos)
+
+    def add_dirt(self, pos: tuple[int, int]):
+        if not self.world.is_open(pos) or pos in self.fields:
+            raise ValueError(f"Cell {pos} is blocked or already dirty.")
+        # writing '*' over the '@' would lose where the run started
+        if pos == self.robot or self.world.grid.cells[pos] == ROBOT:
+            raise ValueError(f"Cell {pos} can't get dirt while the robot is or started on it.")
+        self.world.grid.set_cell(pos, "*")
+        self.world.dirty_cells.add(pos)
+        # a new dirty cell has no field to repair, so it gets a fresh one
+        self.fields[pos] = self.bfs(pos)
+
+    def remove_dirty_cell(self, pos: tuple[int, int]):
+        self.world.remove_dirty_cell(pos)
+        del self.fields[pos]
+        self.legs = {key: leg for key, leg in self.legs.items() if pos not in key}
+
+    def move_robot(self, pos: tuple[int, int]):
+        """
+        Move the robot, e.g. after it has carried out part of the plan. No field depends on where the
+        robot is, so nothing needs repairing. The grid's '@' keeps marking where the run started.
+        """
+        if not self.world.is_open(pos):
+            raise ValueError(f"Cell {pos} is blocked or off the grid.")
+        self.robot = pos
+
+    def repair_increase(self, field: dict[tuple[int, int], int], blocked: tuple[int, int]):
+        """
+        Repair a field after a cell was blocked. First find the cells that lost every shortest path:
+        going outward level by level, a cell is affected if none of its neighbors one step closer
+        is still unaffected. Then settle just those cells again from the unaffected cells around them.
+        """
+        blocked_distance = field.pop(blocked, None)
+        if blocked_distance is None:
+            return
+
+        affected = set()
+        level = [pos for pos in self.get_open_neighbors(blocked) if field.get(pos) == blocked_distance + 1]
+        while level:
+            next_level = list()
+            for pos in level:
+                if pos in affected:
+                    continue
+                distance = field[pos]
+                # the dirty cell itself is always distance 0
+                if distance == 0 or any(
+                    field.get(neighbor) == distance - 1 and neighbor not in affected
+                    for neighbor in self.get_open_neighbors(pos)
+                ):
+                    continue
+                affected.add(pos)
+                next_level += [neighbor for neighbor in self.get_open_neighbors(pos) if field.get(neighbor) == distance + 1]
+            level = next_level
+
+        for pos in affected:
+            del field[pos]
+        self.cells_repaired += len(affected)
+        # the unaffected neighbors of the affected cells are where the new distances come from
+        pq = list()
+        for pos in affected:
+            distances = [field[neighbor] + 1 for neighbor in self.get_open_neighbors(pos) if neighbor in field]
+            if distances:
+                pq.append((min(distances), pos))
+        hq.heapify(pq)
+        while pq:
+            distance, pos = hq.heappop(pq)
+            if pos in field:
+                continue
+            field[pos] = distance
+            for neighbor in self.get_open_neighbors(pos):
+                if neighbor in affected and neighbor not in field:
+                    hq.heappush(pq, (distance + 1, neighbor))
+
+    def repair_decrease(self, field: dict[tuple[int, int], int], opened: tuple[int, int]):
+        """
+        Repair a field after a cell was opened, spreading out from it only as far as distances shrink.
+        """
+        distances = [field[neighbor] for neighbor in self.get_open_neighbors(opened) if neighbor in field]
+        if not distances:
+            return
+        field[opened] = min(distances) + 1
+        self.cells_repaired += 1
+        queue = deque([opened])
+        while queue:
+            pos = queue.popleft()
+            for neighbor in self.get_open_neighbors(pos):
+                if field[pos] + 1 < field.get(neighbor, float("inf")):
+                    field[neighbor] = field[pos] + 1
+                    self.cells_repaired += 1
+                    queue.append(neighbor)
+
+    def get_leg(self, pos: tuple[int, int], dirt: tuple[int, int]) -> list[str]:
+        """
+        Get the moves from a cell to a dirty cell, walking down the dirty cell's distance field.
+        """
+        field = self.fields[dirt]
+        leg = self.legs.get((pos, dirt))
+        # a leg is still shortest unless a shortcut opened up since it was found
+        if leg is not None and len(leg[0]) == field[pos]:
+            return leg[0]
+
+        start = pos
+        moves = list()
+        cells = {pos}
+        while pos != dirt:
+            for move, (dr, dc) in offset_map.items():
+                new_pos = (pos[0] + dr, pos[1] + dc)
+                if field.get(new_pos) == field[pos] - 1:
+                    break
+            moves.append(move)
+            pos = new_pos
+            cells.add(pos)
+        self.legs[(start, dirt)] = (moves, cells)
+        return moves
+
+    def plan(self) -> list[str]:
+        """
+        Get the moves to clean every dirty cell from the robot's current position.
+        """
+        dirt_cells = sorted(self.fields)
+        if not dirt_cells:
+            return []
+        # distances from the robot (row 0) and every dirty cell to every dirty cell (columns 1 on)
+        to_dirt = np.array([
+            [self.fields[dirt].get(pos, float("inf")) for dirt in dirt_cells]
+            for pos in [self.robot] + dirt_cells
+        ], dtype=float)
+        if np.isinf(to_dirt[0]).any():
+            raise ValueError("No valid path found in incremental planner.")
+        # the grid is undirected, so the robot's column mirrors its row
+        matrix = np.hstack((np.concatenate(([0.0], to_dirt[0]))[:, None], to_dirt))
+
+        # only solve the order again if some distance it depends on has changed
+        if self.matrix is None or self.matrix.shape != matrix.shape or not np.array_equal(self.matrix, matrix)\
+            or sorted(self.order) != dirt_cells:
+            self.order = [dirt_cells[i] for i in get_visit_order(matrix)]
+            self.matrix = matrix
+
+        move_seq = list()
+        pos = self.robot
+        for dirt in self.order:
+            move_seq += self.get_leg(pos, dirt)
+            move_seq.append("V")
+            pos = dirt
+        return move_seq
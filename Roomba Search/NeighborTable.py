@@ -0,0 +1,61 @@
+from array import array
+import numpy as np
+
+from config import offset_map
+
+class NeighborTable:
+    """
+    Compressed sparse row (CSR) table of the legal moves out of every cell of a world.
+
+    Cells are numbered row * num_cols + col. The moves out of cell i are
+    moves[offsets[i]:offsets[i + 1]], and they lead to the cells in the same slice of targets.
+    The table is built once per map with array operations, so expanding a state is a slice lookup.
+    """
+    def __init__(self, obstacle_mask: np.ndarray):
+        self.num_rows, self.num_cols = obstacle_mask.shape
+        is_open = ~obstacle_mask
+
+        move_letters = list(offset_map)
+        # legal[i, m]: move m out of cell i stays on the grid and lands on an open cell
+        legal = np.zeros((self.num_rows, self.num_cols, len(move_letters)), dtype=bool)
+        for m, (dr, dc) in enumerate(offset_map.values()):
+            src_rows = slice(max(0, -dr), self.num_rows - max(0, dr))
+            src_cols = slice(max(0, -dc), self.num_cols - max(0, dc))
+            dst_rows = slice(max(0, dr), self.num_rows - max(0, -dr))
+            dst_cols = slice(max(0, dc), self.num_cols - max(0, -dc))
+            legal[src_rows, src_cols, m] = is_open[src_rows, src_cols] & is_open[dst_rows, dst_cols]
+        legal = legal.reshape(-1, len(move_letters))
+
+        # nonzero walks the table in row-major order, so each cell's moves end up contiguous
+        cell_ids, move_ids = np.nonzero(legal)
+        deltas = np.array([dr * self.num_cols + dc for dr, dc in offset_map.values()])
+        offsets = np.zeros(legal.shape[0] + 1, dtype=np.int64)
+        np.cumsum(legal.sum(axis=1), out=offsets[1:])
+
+        # array/str copies index much faster from Python than NumPy arrays, at the same size
+        self.offsets = array("q", offsets.tobytes())
+        self.targets = array("i", (cell_ids + deltas[move_ids]).astype(np.int32).tobytes())
+        self.moves = np.frombuffer("".join(move_letters).encode(), dtype=np.uint8)[move_ids].tobytes().decode()
+        # position -> decoded neighbors, filled in as searches reach each cell
+        self.neighbor_cache: dict[tuple[int, int], tuple[tuple[str, tuple[int, int]], ...]] = dict()
+
+    def get_cell_id(self, pos: tuple[int, int]) -> int:
+        return pos[0] * self.num_cols + pos[1]
+
+    def get_pos(self, cell_id: int) -> tuple[int, int]:
+        return divmod(cell_id, self.num_cols)
+
+    def get_neighbors(self, pos: tuple[int, int]) -> tuple[tuple[str, tuple[int, int]], ...]:
+        """
+        Get the (move, new position) pairs of every legal move out of the given cell.
+        """
+        neighbors = self.neighbor_cache.get(pos)
+        if neighbors is None:
+            cell_id = pos[0] * self.num_cols + pos[1]
+            start, end = self.offsets[cell_id], self.offsets[cell_id + 1]
+            neighbors = tuple(
+                (move, divmod(target, self.num_cols))
+                for move, target in zip(self.moves[start:end], self.targets[start:end])
+            )
+            self.neighbor_cache[pos] = neighbors
+        return neighbors
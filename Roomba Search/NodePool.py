@@ -0,0 +1,50 @@
+from SearchState import SearchState
+
+class NodePool:
+    """
+    Arena of SearchState objects for the search engines to allocate from.
+
+    reset() hands every state back at once, so several searches run in one process
+    reuse the same objects instead of allocating a fresh tree each time.
+    States allocated before a reset must not be used after it.
+
+    Pooled states stay alive until the pool does, even the ones a search has dropped, so at most
+    max_states are kept; past that, states are allocated fresh and freed as usual.
+    """
+    __slots__ = ("states", "num_allocated", "max_states")
+
+    def __init__(self, max_states: int = 1000):
+        self.states: list[SearchState] = list()
+        self.num_allocated = 0
+        self.max_states = max_states
+
+    def __len__(self):
+        return self.num_allocated
+
+    def allocate(self,
+                 pos: tuple[int, int],
+                 dirt_mask: int,
+                 parent: SearchState = None,
+                 move: str = None,
+                 cost: int = 0) -> SearchState:
+        if self.num_allocated >= len(self.states):
+            state = SearchState(pos, dirt_mask, parent, move, cost)
+            if len(self.states) < self.max_states:
+                self.states.append(state)
+        else:
+            state = self.states[self.num_allocated]
+            state.pos = pos
+            state.dirt_mask = dirt_mask
+            state.parent = parent
+            state.move = move
+            state.cost = cost
+        self.num_allocated += 1
+        return state
+
+    def reset(self):
+        # drop parent pointers, so the pool doesn't keep the last search's tree reachable
+        for state in self.states[:self.num_allocated]:
+            state.parent = None
+        # in case max_states was lowered since the states were pooled
+        del self.states[self.max_states:]
+        self.num_allocated = 0
@@ -0,0 +1,45 @@
+class SearchState:
+    """
+    A compact node in the vacuum-world state space.
+
+    A state is identified by the robot's position and a bitmask of the dirt that is
+    still left; the parent pointer, move and cost only record how it was reached.
+    States are never modified after creation, so siblings can share their parent chain.
+    """
+    __slots__ = ("pos", "dirt_mask", "parent", "move", "cost")
+
+    def __init__(self,
+                 pos: tuple[int, int],
+                 dirt_mask: int,
+                 parent: "SearchState" = None,
+                 move: str = None,
+                 cost: int = 0):
+        self.pos = pos
+        self.dirt_mask = dirt_mask
+        self.parent = parent
+        self.move = move
+        self.cost = cost
+
+    @property
+    def key(self) -> tuple[tuple[int, int], int]:
+        return (self.pos, self.dirt_mask)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        if not isinstance(other, SearchState):
+            return NotImplemented
+        return self.key == other.key
+
+    def get_move_seq(self) -> list[str]:
+        """
+        Rebuild the sequence of moves that led from the root state to this one.
+        """
+        moves = list()
+        state = self
+        while state.parent is not None:
+            moves.append(state.move)
+            state = state.parent
+        moves.reverse()
+        return moves
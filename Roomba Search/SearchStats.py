@@ -0,0 +1,142 @@
+from time import perf_counter
+from typing import Callable
+
+def no_clock() -> float:
+    return 0.0
+
+
+class SearchStats:
+    """
+    Counters, phase timers and frontier statistics shared by every search engine.
+
+    Phase timers are only kept when timed is set, since reading the clock around every
+    operation slows the search down. Every sample_every expansions, the frontier size is
+    sampled and the callback (if any) is called with these stats, so long runs can be watched.
+    """
+    def __init__(self,
+                 timed: bool = False,
+                 callback: Callable[["SearchStats"], None] = None,
+                 sample_every: int = 1000):
+        self.nodes_expanded = 0
+        self.nodes_generated = 0
+        # states skipped because an equal state had already been expanded
+        self.duplicates = 0
+        # pruning rule -> states it skipped
+        self.pruned: dict[str, int] = dict()
+        self.frontier_size = 0
+        self.max_frontier = 0
+        self.closed_size = 0
+        # the best bound on the plan's length known so far: a lower bound proven by the best-first
+        # and iterative deepening engines, or the length of anytime A*'s best plan
+        self.bound: float | None = None
+
+        # engines read the clock through this, so untimed runs skip the system call
+        self.clock = perf_counter if timed else no_clock
+        # phase -> seconds spent in it: expansion, legality, copying, frontier, heuristic, ...
+        self.phase_times: dict[str, float] = dict()
+        # (nodes expanded, seconds since the start, frontier size)
+        self.frontier_samples: list[tuple[int, float, int]] = list()
+        self.callback = callback
+        self.sample_every = sample_every
+        self.next_sample = sample_every
+        self.start_time = perf_counter()
+
+    def add_time(self, phase: str, seconds: float):
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    def add_pruned(self, rule: str, count: int = 1):
+        self.pruned[rule] = self.pruned.get(rule, 0) + count
+
+    def on_expand(self, frontier_size: int, closed_size: int):
+        """
+        Record one expansion, along with the size of the frontier and closed set after it.
+        """
+        self.nodes_expanded += 1
+        self.frontier_size = frontier_size
+        self.closed_size = closed_size
+        if frontier_size > self.max_frontier:
+            self.max_frontier = frontier_size
+        self.check_progress()
+
+    def check_progress(self):
+        """
+        Sample the frontier and call the callback once another sample_every nodes have been expanded.
+        Searches that count many expansions at once (Held-Karp's DP, a fleet's robots) call this
+        themselves, so they can be watched and cancelled like the rest.
+        """
+        if self.nodes_expanded >= self.next_sample:
+            self.next_sample = (self.nodes_expanded // self.sample_every + 1) * self.sample_every
+            self.frontier_samples.append((self.nodes_expanded, self.get_elapsed(), self.frontier_size))
+            if self.callback is not None:
+                self.callback(self)
+
+    def make_relay(self) -> "SearchStats":
+        """
+        Get fresh stats for a sub-search, e.g. one robot of a fleet. While it runs, its progress is
+        reported through these stats' callback with its counters added onto these stats' own.
+        Its summary still has to be merged in once it is done.
+        """
+        expanded, generated = self.nodes_expanded, self.nodes_generated
+
+        def relay(sub_stats: "SearchStats"):
+            self.nodes_expanded = expanded + sub_stats.nodes_expanded
+            self.nodes_generated = generated + sub_stats.nodes_generated
+            self.frontier_size = sub_stats.frontier_size
+            try:
+                self.check_progress()
+            finally:
+                self.nodes_expanded, self.nodes_generated = expanded, generated
+
+        return SearchStats(self.clock is perf_counter, relay, self.sample_every)
+
+    def merge(self, summary: dict):
+        """
+        Add the counters and phase times from another search's summary to these stats,
+        e.g. to total up the searches of a fleet's robots.
+        """
+        self.nodes_expanded += summary["nodes_expanded"]
+        self.nodes_generated += summary["nodes_generated"]
+        self.duplicates += summary["duplicates"]
+        self.closed_size += summary["closed_size"]
+        self.max_frontier = max(self.max_frontier, summary["max_frontier"])
+        for phase, seconds in summary["phase_times"].items():
+            self.add_time(phase, seconds)
+        for rule, count in summary["pruned"].items():
+            self.add_pruned(rule, count)
+
+    def get_elapsed(self) -> float:
+        return perf_counter() - self.start_time
+
+    def get_duplicate_rate(self) -> float:
+        """
+        Get the fraction of reached states that turned out to be duplicates.
+        """
+        reached = self.nodes_generated + self.duplicates
+        return self.duplicates / reached if reached else 0.0
+
+    def get_snapshot(self) -> dict:
+        """
+        Get the counters a running search can be watched by.
+        """
+        return {
+            "nodes_expanded": self.nodes_expanded,
+            "nodes_generated": self.nodes_generated,
+            "frontier_size": self.frontier_size,
+            "bound": self.bound,
+            "elapsed": self.get_elapsed()
+        }
+
+    def summary(self) -> dict:
+        return {
+            "nodes_expanded": self.nodes_expanded,
+            "nodes_generated": self.nodes_generated,
+            "duplicates": self.duplicates,
+            "duplicate_rate": self.get_duplicate_rate(),
+            "pruned": dict(self.pruned),
+            "max_frontier": self.max_frontier,
+            "closed_size": self.closed_size,
+            "bound": self.bound,
+            "elapsed": self.get_elapsed(),
+            "phase_times": dict(self.phase_times),
+            "frontier_samples": list(self.frontier_samples)
+        }
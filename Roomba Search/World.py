@@ -1,52 +1,275 @@
+import multiprocessing
+import threading
+from queue import Queue
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterator
+import numpy as np
+
 from WorldModel import WorldModel
-from Agent import Agent
-from searches import dfs, ucs
+from Grid import Grid
+from world_loader import parse_grid, read_grid
+from NodePool import NodePool
+from SearchStats import SearchStats
+from searches import dfs, iddfs, ucs, astar, contracted_astar, anytime_astar, ida_star, held_karp_legs
+from fleet import partition_dirt, make_robot_grid
+
+algorithms = (
+    "depth-first", "iterative-deepening", "uniform-cost", "a-star", "contracted-a-star",
+    "anytime-a-star", "ida-star", "held-karp"
+)
 
 class World(WorldModel):
     def __init__(self, file_contents:str):
-        world_lst = file_contents.split("\n")
-        self.num_rows = int(world_lst[1])
-        self.num_cols = int(world_lst[0])
+        # parse the text straight into the grid's array, checking it against the header
+        grid = parse_grid(np.frombuffer(file_contents.encode("ascii"), dtype=np.uint8))
+        super().__init__(grid, set(grid.find("*")))
+
+    @classmethod
+    def from_grid(cls, grid:Grid) -> "World":
+        world = cls.__new__(cls)
+        WorldModel.__init__(world, grid, set(grid.find("*")))
+        return world
+
+    @classmethod
+    def load(cls, world_file:str) -> "World":
+        """
+        Load a world file without reading it into one big string first.
+        """
+        return cls.from_grid(read_grid(world_file))
 
-        self.grid:list[list[str]] = list()
-        self.dirty_cells = set()
-        for i, row in enumerate(world_lst[2:]):
-            self.grid.append(list())
-            for j, c in enumerate(row):
-                self.grid[i].append(c)
-                if c == "*":
-                    self.dirty_cells.add((i, j))
 
+    def search(self, algorithm:str, heuristic:str="mst", depth_limit:int=None, pool:NodePool=None,
+               stats:SearchStats=None, time_budget:float=None, node_budget:int=None,
+               distances:str="exact", workers:int=None, table_size:int=None,
+               on_leg:Callable[[int, list[str]], None]=None, pruning:tuple[str, ...]=()) -> dict:
+        """
+        Plan a path that cleans every dirty cell. Pass a SearchStats to time the search's
+        phases or watch its progress; a summary of it is returned under "stats" either way.
 
-    def search(self, algorithm:str) -> dict:
-        if algorithm not in {"depth-first", "uniform-cost"}:
-            raise ValueError(f"Unknown algorithm: {algorithm}. Supported algorithms: depth-first, uniform-cost.")
+        anytime-a-star stops once time_budget seconds have passed or node_budget nodes have been
+        expanded, returning the best plan found so far; "optimal" says whether it is proven optimal.
+        a-star, anytime-a-star and held-karp measure distances between cells with the given provider,
+        "exact" or "hierarchical" (faster on huge maps, but the plans may be a little longer).
+        contracted-a-star searches the map's corridor graph instead of its cells, which is much smaller
+        on maze-like maps.
+        ida-star keeps up to table_size states in a transposition table, if given.
+        uniform-cost and a-star skip states ruled out by the given pruning rules (see searches.pruning_rules).
 
+        Maps with several robots are split into one sub-problem per robot, which are solved on a pool of
+        worker processes (or in this process if workers is 1). "paths" holds each robot's moves,
+        and "makespan" the length of the longest; a single robot's moves are also under "path".
+
+        on_leg, if given, is called with a robot's index and the moves of each leg of its plan (ending with
+        the vacuum), in order. held-karp calls it as soon as each leg is expanded, the others once the plan is done.
+        """
+        if algorithm not in algorithms:
+            raise ValueError(f"Unknown algorithm: {algorithm}. Supported algorithms: {', '.join(algorithms)}.")
+        if (time_budget is not None or node_budget is not None) and algorithm != "anytime-a-star":
+            raise ValueError("Only anytime-a-star supports a time or node budget.")
+        if pruning and algorithm not in {"uniform-cost", "a-star"}:
+            raise ValueError("Only uniform-cost and a-star support pruning.")
+
+        robots = self.get_bot_positions()
+        if len(robots) > 1:
+            options = {
+                "heuristic": heuristic,
+                "depth_limit": depth_limit,
+                "time_budget": time_budget,
+                "node_budget": node_budget,
+                "distances": distances,
+                "table_size": table_size,
+                "pruning": pruning
+            }
+            output = self.search_fleet(robots, algorithm, options, workers, stats)
+            if on_leg is not None:
+                for robot, path in enumerate(output["paths"]):
+                    for leg in split_legs(path):
+                        on_leg(robot, leg)
+            return output
+
+        stats = stats if stats is not None else SearchStats()
         output = {
             "path": [],
             "nodes_generated": 0,
-            "nodes_expanded": 0
+            "nodes_expanded": 0,
+            # DFS returns the first plan it finds, every other mode a shortest one
+            "optimal": algorithm != "depth-first" and (
+                distances == "exact"
+                or algorithm not in {"a-star", "contracted-a-star", "anytime-a-star", "ida-star", "held-karp"}
+            )
         }
 
-        # create an agent to explore the world
-        current_agent = Agent(
-            # pass the world model to the agent
-            world=self,
-            # get the initial position of the bot from the grid
-            initial_pos=self.get_bot_pos_from_grid()
-        )
-
         match algorithm:
             # Depth-First Search
             case "depth-first":
-                current_agent = dfs(current_agent)
-                output["nodes_expanded"] = current_agent.nodes_expanded
-                output["nodes_generated"] = current_agent.nodes_generated
-            # Uniform Cost Search (basically BFS)
+                nodes_expanded, nodes_generated, move_seq = dfs(self, depth_limit, pool, stats)
+                output["nodes_expanded"] = nodes_expanded
+                output["nodes_generated"] = nodes_generated
+                output["path"] = move_seq
+            # Depth-First Search with increasing depth limits, up to depth_limit if given
+            case "iterative-deepening":
+                nodes_expanded, nodes_generated, move_seq = iddfs(self, depth_limit, pool, stats)
+                output["nodes_expanded"] = nodes_expanded
+                output["nodes_generated"] = nodes_generated
+                output["path"] = move_seq
+            # Uniform Cost Search (basically BFS) over compact (pos, dirt mask) states
             case "uniform-cost":
-                nodes_expanded, nodes_generated, current_agent = ucs(current_agent)
+                nodes_expanded, nodes_generated, move_seq = ucs(self, pool, stats, pruning=pruning)
+                output["nodes_expanded"] = nodes_expanded
+                output["nodes_generated"] = nodes_generated
+                output["path"] = move_seq
+            # A* over the same states, guided by an admissible heuristic
+            case "a-star":
+                nodes_expanded, nodes_generated, move_seq = astar(self, heuristic, pool, stats, distances, pruning)
+                output["nodes_expanded"] = nodes_expanded
+                output["nodes_generated"] = nodes_generated
+                output["path"] = move_seq
+            # A* over the corridor graph, where edges cost their length
+            case "contracted-a-star":
+                nodes_expanded, nodes_generated, move_seq = contracted_astar(self, heuristic, stats, distances)
                 output["nodes_expanded"] = nodes_expanded
                 output["nodes_generated"] = nodes_generated
+                output["path"] = move_seq
+            # weighted A* that keeps improving a greedy plan until it is proven optimal or out of budget
+            case "anytime-a-star":
+                nodes_expanded, nodes_generated, move_seq, optimal = anytime_astar(
+                    self, heuristic, time_budget=time_budget, node_budget=node_budget,
+                    pool=pool, stats=stats, distances=distances
+                )
+                output["nodes_expanded"] = nodes_expanded
+                output["nodes_generated"] = nodes_generated
+                output["path"] = move_seq
+                output["optimal"] = optimal
+            # A* in O(depth) memory, by iterative deepening on f = g + h
+            case "ida-star":
+                nodes_expanded, nodes_generated, move_seq = ida_star(self, heuristic, table_size, stats, distances)
+                output["nodes_expanded"] = nodes_expanded
+                output["nodes_generated"] = nodes_generated
+                output["path"] = move_seq
+            # exact TSP over the dirty cells, expanded back into grid moves
+            case "held-karp":
+                move_seq = list()
+                # each leg is final as soon as it is expanded, so it can be handed out right away
+                for leg in held_karp_legs(self, stats, distances):
+                    if on_leg is not None:
+                        on_leg(0, leg)
+                    move_seq += leg
+                output["nodes_expanded"] = stats.nodes_expanded
+                output["nodes_generated"] = stats.nodes_generated
+                output["path"] = move_seq
+
+        if on_leg is not None and algorithm != "held-karp":
+            for leg in split_legs(output["path"]):
+                on_leg(0, leg)
+        output["paths"] = [output["path"]]
+        output["makespan"] = len(output["path"])
+        output["stats"] = stats.summary()
+        return output
+
+    def search_stream(self, algorithm:str, heuristic:str="mst", progress_every:int=None, **options) -> Iterator[dict]:
+        """
+        Search like search, with the same options (except stats), but yield events as it goes:
+        {"event": "progress", ...} with the counters and bound every progress_every expansions, if given;
+        {"event": "leg", "robot": i, "moves": [...]} as soon as each leg of a plan is final;
+        and finally {"event": "done", ...} with search's output. Errors from the search are raised here.
+
+        The search runs on a background thread. Closing the generator early stops it at its next progress check.
+        """
+        events = Queue()
+        closed = threading.Event()
+
+        def on_progress(stats: SearchStats):
+            if closed.is_set():
+                raise InterruptedError("The search stream was closed.")
+            if progress_every:
+                events.put({"event": "progress", **stats.get_snapshot()})
+
+        def run():
+            try:
+                stats = SearchStats(callback=on_progress, sample_every=progress_every or 1000)
+                output = self.search(algorithm, heuristic, stats=stats,
+                                     on_leg=lambda robot, leg: events.put({"event": "leg", "robot": robot, "moves": leg}),
+                                     **options)
+                events.put({"event": "done", **output})
+            except Exception as error:
+                events.put({"event": "error", "error": error})
+
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            while True:
+                event = events.get()
+                if event["event"] == "error":
+                    raise event["error"]
+                yield event
+                if event["event"] == "done":
+                    return
+        finally:
+            closed.set()
+
+    def search_fleet(self, robots:list[tuple[int, int]], algorithm:str, options:dict, workers:int=None,
+                     stats:SearchStats=None) -> dict:
+        """
+        Partition the dirt among the robots, then plan each robot's share separately.
+        The robots' stats are added up into stats, whose summary is returned under "stats", and its callback
+        is called as they progress: during each robot's search in this process, or as each worker finishes.
+        """
+        stats = stats if stats is not None else SearchStats()
+        shares = partition_dirt(self, robots)
+        grids = [make_robot_grid(self, robot, share) for robot, share in zip(robots, shares)]
+        if workers == 1:
+            outputs = list()
+            for grid in grids:
+                # the robot's progress is passed on to stats' callback as it goes
+                output = search_robot(grid, algorithm, {**options, "stats": stats.make_relay()})
+                stats.merge(output["stats"])
+                stats.check_progress()
+                outputs.append(output)
+        else:
+            # like planner.py, fork workers from a server that has already imported the planner
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["World"])
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = [executor.submit(search_robot, grid, algorithm, options) for grid in grids]
+                # workers can't call back into this process, so progress is reported as each robot finishes
+                try:
+                    for future in as_completed(futures):
+                        stats.merge(future.result()["stats"])
+                        stats.check_progress()
+                except BaseException:
+                    # an error or a cancelling callback drops the robots that haven't started yet
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+            outputs = [future.result() for future in futures]
+
+        paths = [output["path"] for output in outputs]
+        return {
+            "paths": paths,
+            "makespan": max(map(len, paths)),
+            "nodes_generated": sum(output["nodes_generated"] for output in outputs),
+            "nodes_expanded": sum(output["nodes_expanded"] for output in outputs),
+            # each robot's plan may be optimal, but the partition is only a heuristic
+            "optimal": False,
+            "stats": stats.summary(),
+            "robot_stats": [output["stats"] for output in outputs]
+        }
+
+
+def split_legs(move_seq:list[str]) -> list[list[str]]:
+    """
+    Split a plan into legs, each ending with a vacuum.
+    """
+    legs = list()
+    leg = list()
+    for move in move_seq:
+        leg.append(move)
+        if move == "V":
+            legs.append(leg)
+            leg = list()
+    if leg:
+        legs.append(leg)
+    return legs
+
 
-        output["path"] = current_agent.move_seq
-        return output
\ No newline at end of file
+def search_robot(grid:Grid, algorithm:str, options:dict) -> dict:
+    # runs in a worker process, planning one robot's share of a fleet's dirt
+    return World.from_grid(grid).search(algorithm, **options)
\ No newline at end of file
@@ -1,19 +1,74 @@
+import hashlib
+
+from Grid import Grid
+from NeighborTable import NeighborTable
+
 class WorldModel:
     def __init__(self,
-                 grid: list[list[str]],
+                 grid: Grid | list[list[str]],
                  dirty_cells: set[tuple[int, int]],):
-        self.grid = grid
-        self.num_rows = len(grid)
-        self.num_cols = len(grid[0]) if self.num_rows > 0 else 0
+        # list-of-lists grids are converted, so every world model is array-backed
+        self.grid = grid if isinstance(grid, Grid) else Grid.from_rows(grid)
+        self.num_rows, self.num_cols = self.grid.shape
         self.dirty_cells = dirty_cells
+        self.neighbor_table: NeighborTable | None = None
+        self.neighbor_table_version = -1
+
+    @property
+    def obstacle_mask(self):
+        return self.grid.obstacle_mask
+
+    @property
+    def dirt_mask(self):
+        return self.grid.dirt_mask
 
     def get_bot_pos_from_grid(self):
-        for row in range(self.num_rows):
-            for col in range(self.num_cols):
-                if self.grid[row][col] == "@":
-                    return (row, col)
-        raise ValueError("No bot found in the grid")
+        bots = self.grid.find("@")
+        if not bots:
+            raise ValueError("No bot found in the grid")
+        return bots[0]
+
+    def get_bot_positions(self) -> list[tuple[int, int]]:
+        """
+        Get the start of every robot in the grid, in row-major order.
+        """
+        bots = self.grid.find("@")
+        if not bots:
+            raise ValueError("No bot found in the grid")
+        return bots
     
+    def is_open(self, pos: tuple[int, int]) -> bool:
+        """
+        Check if the robot can stand on the cell at the given position.
+        """
+        return 0 <= pos[0] < self.num_rows\
+            and 0 <= pos[1] < self.num_cols\
+            and not self.grid.obstacle_mask[pos]
+
+    def get_neighbor_table(self) -> NeighborTable:
+        """
+        Get the table of legal moves out of each cell, rebuilding it only if an obstacle has changed.
+        """
+        if self.neighbor_table_version != self.grid.obstacle_version:
+            self.neighbor_table = NeighborTable(self.grid.obstacle_mask)
+            self.neighbor_table_version = self.grid.obstacle_version
+        return self.neighbor_table
+
+    def get_dirt_index(self) -> dict[tuple[int, int], int]:
+        """
+        Assign each dirty cell a bit position, so a set of remaining dirt can be stored as an int mask.
+        """
+        return {pos: i for i, pos in enumerate(sorted(self.dirty_cells))}
+
+    def get_grid_hash(self) -> str:
+        """
+        Hash the contents of the world, so caches can recognize a map they've already seen.
+        """
+        grid_hash = hashlib.sha1(f"{self.num_rows}x{self.num_cols}".encode())
+        grid_hash.update(self.grid.cells.tobytes())
+        grid_hash.update(repr(sorted(self.dirty_cells)).encode())
+        return grid_hash.hexdigest()
+
     def is_dirty(self, pos: tuple[int, int]) -> bool:
         """
         Check if the cell at the given position is dirty.
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+bench_memory.py
+Compares the peak memory of searches whose states are slotted (SearchState, as the engines
+allocate them) against the same states keeping their fields in a dict, then the peak memory
+and run time of searches run with and without a shared NodePool, for pools of a few sizes.
+
+On a 30x30 map with 5 dirty cells, slotted states save about 4% of a uniform-cost search's peak
+and 20% of a depth-first one's, since Python 3.11 already stores plain instance fields compactly.
+The pool never lowers peak memory, since the states it keeps add to each search's own tree. It only
+saves time once it holds a whole search (about 20% for uniform-cost, at 60% more memory). At the
+default cap of 1000 states it is slightly slower than allocating fresh nodes.
+
+Usage:
+    python3 bench_memory.py [max_states ...]
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+import searches
+from World import World
+from Grid import Grid
+from NodePool import NodePool
+from SearchState import SearchState
+from make_vacuum_world import generate_grid, make_reachable
+
+# SearchState with the same methods but no __slots__, so each state keeps its fields in a dict
+DictSearchState = type("DictSearchState", (), {
+    name: value for name, value in vars(SearchState).items()
+    if name not in SearchState.__slots__ and name != "__slots__"
+})
+
+
+def measure_peak(fn) -> int:
+    """
+    Run fn and return the peak number of bytes allocated while it ran, holding on to its result.
+    """
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def measure_time(fn, repeats: int = 3) -> float:
+    """
+    Get the best time of a few runs of fn, in seconds.
+    """
+    times = list()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def make_world(rows: int, cols: int, blocked_fraction: float, num_dirty: int, seed: int = 0) -> World:
+    rng = np.random.default_rng(seed)
+    cells = generate_grid(rng, rows, cols, blocked_fraction, num_dirty)
+    make_reachable(rng, cells, "repair")
+    return World.from_grid(Grid(cells))
+
+
+def search_with_states(world: World, algorithm: str, state_class: type) -> dict:
+    # the engines allocate their states through the name searches imported
+    searches.SearchState = state_class
+    try:
+        return world.search(algorithm)
+    finally:
+        searches.SearchState = SearchState
+
+
+def main():
+    pool_sizes = [int(size) for size in sys.argv[1:]] or [100, 1000, 10000, 100000]
+    world = make_world(30, 30, 0.15, 5)
+
+    # warm the neighbor table and distance oracle caches, so only the searches are measured
+    world.search("a-star")
+    for algorithm in ("uniform-cost", "a-star", "depth-first"):
+        print(f"Peak memory for one {algorithm} search:")
+        for state_class in (SearchState, DictSearchState):
+            output = search_with_states(world, algorithm, state_class)
+            peak = measure_peak(lambda: search_with_states(world, algorithm, state_class))
+            print(f"  {state_class.__name__:15} {peak / 2**20:8.2f} MiB"
+                  f" ({output['nodes_generated']} states generated)")
+
+    for algorithm in ("uniform-cost", "a-star", "depth-first"):
+        print(f"Peak memory and time for 3 consecutive {algorithm} searches:")
+        peak = measure_peak(lambda: [world.search(algorithm) for _ in range(3)])
+        seconds = measure_time(lambda: [world.search(algorithm) for _ in range(3)])
+        print(f"  fresh nodes:            {peak / 2**20:8.2f} MiB {seconds * 1000:8.1f} ms")
+        for max_states in pool_sizes:
+            pool = NodePool(max_states)
+            peak = measure_peak(lambda: [world.search(algorithm, pool=pool) for _ in range(3)])
+            seconds = measure_time(lambda: [world.search(algorithm, pool=pool) for _ in range(3)])
+            print(f"  pool of {max_states:>7} states: {peak / 2**20:8.2f} MiB {seconds * 1000:8.1f} ms"
+                  f" ({len(pool.states)} pooled states)")
+
+if __name__ == "__main__":
+    main()
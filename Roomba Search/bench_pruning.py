@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+bench_pruning.py
+Compares the nodes uniform-cost and a-star expand and generate with each pruning rule,
+and with all of them together, against searching without pruning.
+
+Usage:
+    python3 bench_pruning.py [world-file ...]
+"""
+import os
+import sys
+
+from World import World
+from searches import pruning_rules
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_MAPS = ["random-5x7.txt", "random-11x6.txt", "random-20x5.txt"]
+RULE_SETS = [()] + [(rule,) for rule in pruning_rules] + [pruning_rules]
+
+def main():
+    world_files = sys.argv[1:] or [os.path.join(HERE, name) for name in SAMPLE_MAPS]
+    for world_file in world_files:
+        world = World.load(world_file)
+        print(os.path.basename(world_file))
+        for algorithm in ("uniform-cost", "a-star"):
+            baseline = world.search(algorithm)
+            for pruning in RULE_SETS:
+                output = world.search(algorithm, pruning=pruning)
+                assert len(output["path"]) == len(baseline["path"])
+                expanded = output["nodes_expanded"] / baseline["nodes_expanded"] - 1
+                generated = output["nodes_generated"] / baseline["nodes_generated"] - 1
+                pruned = ", ".join(f"{rule} {count}" for rule, count in output["stats"]["pruned"].items())
+                print(f"  {algorithm:13} {'+'.join(pruning) or 'no pruning':45}"
+                      f" expanded {output['nodes_expanded']:6} ({expanded:+6.1%}),"
+                      f" generated {output['nodes_generated']:6} ({generated:+6.1%})"
+                      + (f", pruned: {pruned}" if pruned else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+bench_replan.py
+Compares the latency of replanning with IncrementalPlanner after each change to the world,
+against building a fresh World and running a full held-karp search.
+
+Usage:
+    python3 bench_replan.py [size] [num_dirty] [num_events] [seed]
+"""
+import sys
+import time
+import random
+import statistics
+import numpy as np
+
+from World import World
+from Grid import Grid, EMPTY
+from IncrementalPlanner import IncrementalPlanner
+from make_vacuum_world import generate_grid, make_reachable
+
+def make_events(rng: random.Random, cells: np.ndarray, num_events: int) -> list[tuple[str, tuple[int, int]]]:
+    """
+    Pick a sequence of obstacles appearing on empty cells and disappearing again,
+    with the occasional new dirty cell.
+    """
+    rows, cols = cells.shape
+    empty = [tuple(pos) for pos in np.argwhere(cells == EMPTY).tolist()]
+    rng.shuffle(empty)
+    events = list()
+    blocked = list()
+    while len(events) < num_events and empty:
+        roll = rng.random()
+        if roll < 0.1:
+            events.append(("add-dirt", empty.pop()))
+        elif roll < 0.4 and blocked:
+            events.append(("remove-obstacle", blocked.pop(rng.randrange(len(blocked)))))
+        else:
+            blocked.append(empty.pop())
+            events.append(("add-obstacle", blocked[-1]))
+    return events
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    num_dirty = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    num_events = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    rng = np.random.default_rng(seed)
+    cells = generate_grid(rng, size, size, 0.2, num_dirty)
+    make_reachable(rng, cells, "repair")
+    events = make_events(random.Random(seed), cells, num_events)
+
+    world = World.from_grid(Grid(cells.copy()))
+    start = time.perf_counter()
+    planner = IncrementalPlanner(world)
+    planner.plan()
+    print(f"{size}x{size} grid, {num_dirty} dirty cells, {len(events)} change events")
+    print(f"  initial incremental plan: {(time.perf_counter() - start) * 1000:9.2f} ms")
+
+    incremental_times = list()
+    full_times = list()
+    for event, pos in events:
+        start = time.perf_counter()
+        planner.apply(event, pos)
+        move_seq = planner.plan()
+        incremental_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        output = World.from_grid(Grid(world.grid.cells.copy())).search("held-karp")
+        full_times.append(time.perf_counter() - start)
+        assert len(output["path"]) == len(move_seq)
+
+    for name, times in (("incremental", incremental_times), ("full replan", full_times)):
+        print(f"  {name + ':':12} median {statistics.median(times) * 1000:9.2f} ms,"
+              f" max {max(times) * 1000:9.2f} ms")
+    print(f"  speedup (median): {statistics.median(full_times) / statistics.median(incremental_times):.1f}x,"
+          f" {planner.cells_repaired} field cells repaired in total")
+
+if __name__ == "__main__":
+    main()
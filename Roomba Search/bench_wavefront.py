@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+bench_wavefront.py
+Compares the NumPy wavefront BFS kernel against a plain Python BFS over the grid,
+for the distance field of one source, the nearest of several sources, and one field per source.
+
+Usage:
+    python3 bench_wavefront.py [num_sources] [seed] [size ...]
+"""
+import sys
+import time
+from collections import deque
+import numpy as np
+
+from Grid import BLOCKED
+from make_vacuum_world import generate_grid
+from wavefront import wavefront_bfs, distance_fields, UNREACHED
+
+def python_bfs(obstacle_mask: np.ndarray, sources: list[tuple[int, int]]) -> list[list[int]]:
+    """
+    Multi-source BFS one cell at a time, over nested lists.
+    """
+    rows, cols = obstacle_mask.shape
+    blocked = obstacle_mask.tolist()
+    distances = [[UNREACHED] * cols for _ in range(rows)]
+    queue = deque()
+    for r, c in sources:
+        distances[r][c] = 0
+        queue.append((r, c))
+    while queue:
+        r, c = queue.popleft()
+        distance = distances[r][c] + 1
+        for new_r, new_c in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if 0 <= new_r < rows and 0 <= new_c < cols and not blocked[new_r][new_c]\
+                and distances[new_r][new_c] == UNREACHED:
+                distances[new_r][new_c] = distance
+                queue.append((new_r, new_c))
+    return distances
+
+
+def time_it(function, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    num_sources = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    sizes = [int(size) for size in sys.argv[3:]] or [500, 2000]
+
+    for size in sizes:
+        rng = np.random.default_rng(seed)
+        obstacle_mask = generate_grid(rng, size, size, 0.2, 0) == BLOCKED
+        open_cells = np.argwhere(~obstacle_mask)
+        sources = [tuple(pos) for pos in open_cells[rng.choice(len(open_cells), num_sources, replace=False)].tolist()]
+        print(f"{size}x{size} grid, {num_sources} sources")
+
+        python_time, expected = time_it(python_bfs, obstacle_mask, sources[:1])
+        numpy_time, distances = time_it(wavefront_bfs, obstacle_mask, sources[:1])
+        assert (distances == np.array(expected)).all()
+        print(f"  one source:       python {python_time * 1000:9.1f} ms, numpy {numpy_time * 1000:9.1f} ms,"
+              f" {python_time / numpy_time:5.1f}x")
+
+        python_time, expected = time_it(python_bfs, obstacle_mask, sources)
+        numpy_time, (distances, _) = time_it(wavefront_bfs, obstacle_mask, sources, True)
+        assert (distances == np.array(expected)).all()
+        print(f"  nearest source:   python {python_time * 1000:9.1f} ms, numpy {numpy_time * 1000:9.1f} ms,"
+              f" {python_time / numpy_time:5.1f}x")
+
+        python_time = 0.0
+        expected = list()
+        for source in sources:
+            source_time, field = time_it(python_bfs, obstacle_mask, [source])
+            python_time += source_time
+            expected.append(field)
+        numpy_time, fields = time_it(distance_fields, obstacle_mask, sources)
+        assert (fields == np.array(expected)).all()
+        print(f"  field per source: python {python_time * 1000:9.1f} ms, numpy {numpy_time * 1000:9.1f} ms,"
+              f" {python_time / numpy_time:5.1f}x")
+
+if __name__ == "__main__":
+    main()
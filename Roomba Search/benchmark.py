@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+benchmark.py
+Measures how every World.search algorithm scales with grid size, obstacle fraction and dirt count.
+
+Usage:
+    python3 benchmark.py run <results.csv|results.json> [sizes] [blocked_fractions] [dirt_counts] [maps_per_config] [timeout] [seed]
+    python3 benchmark.py compare <baseline> <candidate> [threshold]
+
+Example:
+    python3 benchmark.py run before.json 10,20,40 0.1,0.3 2,4,6 3 10 0
+    python3 benchmark.py compare before.json after.json 0.2
+
+Each configuration is a seeded corpus of square maps from make_vacuum_world.py, with every
+dirty cell reachable. Every (map, algorithm) job runs in its own worker process via planner.py,
+and records wall time, node counts and rates, peak RSS and solution length.
+compare exits with status 1 if the candidate regressed against the baseline.
+"""
+import os
+import sys
+import csv
+import json
+import tempfile
+from itertools import product
+
+from World import algorithms
+from planner import plan_batch
+from make_vacuum_world import generate_corpus
+
+CONFIG_FIELDS = ["rows", "cols", "blocked_fraction", "num_dirty", "algorithm"]
+RECORD_FIELDS = CONFIG_FIELDS + [
+    "map", "status", "path_length", "nodes_expanded", "nodes_generated",
+    "wall_time", "nodes_expanded_per_sec", "nodes_generated_per_sec", "peak_rss_kb"
+]
+
+def run_benchmark(sizes: list[int], blocked_fractions: list[float], dirt_counts: list[int],
+                  maps_per_config: int = 3, timeout: float = 10, seed: int = 0,
+                  bench_algorithms: list[str] = algorithms, workers: int = None) -> list[dict]:
+    results = list()
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        for size, blocked_fraction, num_dirty in product(sizes, blocked_fractions, dirt_counts):
+            config_dir = os.path.join(corpus_dir, f"{size}-{blocked_fraction}-{num_dirty}")
+            generate_corpus(config_dir, maps_per_config, size, size, blocked_fraction, num_dirty, seed, "repair")
+            world_files = sorted(
+                os.path.join(config_dir, name) for name in os.listdir(config_dir) if name.endswith(".txt")
+            )
+            for record in plan_batch(world_files, list(bench_algorithms), timeout=timeout, workers=workers):
+                row = {
+                    "rows": size,
+                    "cols": size,
+                    "blocked_fraction": blocked_fraction,
+                    "num_dirty": num_dirty,
+                    "algorithm": record["algorithm"],
+                    "map": os.path.basename(record["world_file"]),
+                    "status": record["status"],
+                    "wall_time": record["wall_time"],
+                    "peak_rss_kb": record["peak_rss_kb"]
+                }
+                if record["status"] == "ok":
+                    row["path_length"] = record["path_length"]
+                    row["nodes_expanded"] = record["nodes_expanded"]
+                    row["nodes_generated"] = record["nodes_generated"]
+                    row["nodes_expanded_per_sec"] = record["nodes_expanded"] / record["wall_time"]
+                    row["nodes_generated_per_sec"] = record["nodes_generated"] / record["wall_time"]
+                results.append(row)
+                print(json.dumps(row), file=sys.stderr, flush=True)
+    results.sort(key=lambda row: tuple(row[field] for field in CONFIG_FIELDS + ["map"]))
+    return results
+
+
+def save_results(results: list[dict], results_file: str):
+    if results_file.endswith(".json"):
+        with open(results_file, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        with open(results_file, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=RECORD_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+
+def load_results(results_file: str) -> list[dict]:
+    if results_file.endswith(".json"):
+        with open(results_file) as file:
+            return json.load(file)
+    # CSV loses types, so convert the numeric columns back
+    results = list()
+    with open(results_file, newline="") as file:
+        for row in csv.DictReader(file):
+            for field, value in row.items():
+                if field in {"algorithm", "map", "status"}:
+                    continue
+                if value == "":
+                    row[field] = None
+                else:
+                    row[field] = float(value) if "." in value or "e" in value else int(value)
+            results.append(row)
+    return results
+
+
+def summarize(results: list[dict]) -> dict[tuple, dict]:
+    """
+    Total each configuration's results over its maps, so single noisy runs don't dominate.
+    """
+    summary = dict()
+    for row in results:
+        key = tuple(row[field] for field in CONFIG_FIELDS)
+        totals = summary.setdefault(key, {
+            "maps": 0, "failures": 0, "wall_time": 0.0, "path_length": 0, "nodes_expanded": 0, "peak_rss_kb": 0
+        })
+        totals["maps"] += 1
+        totals["wall_time"] += row["wall_time"]
+        totals["peak_rss_kb"] = max(totals["peak_rss_kb"], row["peak_rss_kb"])
+        if row["status"] == "ok":
+            totals["path_length"] += row["path_length"]
+            totals["nodes_expanded"] += row["nodes_expanded"]
+        else:
+            totals["failures"] += 1
+    return summary
+
+
+def compare_results(baseline: list[dict], candidate: list[dict], threshold: float = 0.2) -> list[str]:
+    """
+    List the regressions of candidate against baseline: new failures, longer solutions, more expanded
+    nodes, or wall time / peak RSS more than threshold (as a fraction) above the baseline.
+    """
+    regressions = list()
+    baseline_summary = summarize(baseline)
+    candidate_summary = summarize(candidate)
+    for key, new in sorted(candidate_summary.items()):
+        if key not in baseline_summary:
+            continue
+        old = baseline_summary[key]
+        name = "{}x{} blocked={} dirty={} {}".format(*key)
+        if new["failures"] > old["failures"]:
+            regressions.append(f"{name}: {new['failures']} failed runs, was {old['failures']}")
+            continue
+        # only compare solution quality when both sides solved every map
+        if not new["failures"] and not old["failures"]:
+            if new["path_length"] > old["path_length"]:
+                regressions.append(f"{name}: total path length {new['path_length']}, was {old['path_length']}")
+            if new["nodes_expanded"] > old["nodes_expanded"]:
+                regressions.append(f"{name}: {new['nodes_expanded']} nodes expanded, was {old['nodes_expanded']}")
+        for metric in ("wall_time", "peak_rss_kb"):
+            if new[metric] > old[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {new[metric]:.4g}, was {old[metric]:.4g}")
+    return regressions
+
+
+def parse_list(value: str, parse) -> list:
+    return [parse(item) for item in value.split(",")]
+
+
+def main():
+    if len(sys.argv) >= 3 and sys.argv[1] == "run":
+        args = sys.argv[3:]
+        results = run_benchmark(
+            sizes=parse_list(args[0], int) if len(args) > 0 else [10, 20, 40],
+            blocked_fractions=parse_list(args[1], float) if len(args) > 1 else [0.1, 0.3],
+            dirt_counts=parse_list(args[2], int) if len(args) > 2 else [2, 4, 6],
+            maps_per_config=int(args[3]) if len(args) > 3 else 3,
+            timeout=float(args[4]) if len(args) > 4 else 10,
+            seed=int(args[5]) if len(args) > 5 else 0
+        )
+        save_results(results, sys.argv[2])
+        print(f"Wrote {len(results)} results to {sys.argv[2]}")
+
+    elif len(sys.argv) in {4, 5} and sys.argv[1] == "compare":
+        threshold = float(sys.argv[4]) if len(sys.argv) == 5 else 0.2
+        regressions = compare_results(load_results(sys.argv[2]), load_results(sys.argv[3]), threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
+
+    else:
+        print("Usage: python3 benchmark.py run <results.csv|results.json> [sizes] [blocked_fractions] [dirt_counts] [maps_per_config] [timeout] [seed]")
+        print("       python3 benchmark.py compare <baseline> <candidate> [threshold]")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
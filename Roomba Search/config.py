@@ -24,4 +24,10 @@ def get_offset(pos1: tuple[int, int],
 
 def is_adjacent(pos1: tuple[int, int],
                 pos2: tuple[int, int]) -> bool:
-    return get_offset(pos1, pos2) in offset_map.values()
\ No newline at end of file
+    return get_offset(pos1, pos2) in offset_map.values()
+
+# offset:move map, the inverse of offset_map
+move_map = {
+    offset: move
+    for move, offset in offset_map.items()
+}
@@ -0,0 +1,50 @@
+import numpy as np
+
+from WorldModel import WorldModel
+from Grid import Grid, EMPTY, DIRTY, ROBOT
+from DistanceOracle import DistanceOracle
+
+def partition_dirt(world: WorldModel,
+                   robots: list[tuple[int, int]]) -> list[list[tuple[int, int]]]:
+    """
+    Split the dirty cells among the robots. Each step extends whichever robot's route would finish
+    earliest with its nearest unassigned dirty cell, so the routes end up about as long as each other
+    and the makespan stays low. Route lengths are estimated with maze distances.
+    Returns each robot's dirty cells, in the order the robots are given.
+    """
+    # every dirty cell is a BFS source of the oracle, so distances from any robot to it are lookups
+    oracle = DistanceOracle.for_world(world)
+    shares = [list() for _ in robots]
+    # estimated time each robot finishes its route so far, and where it ends up
+    finish_times = [0] * len(robots)
+    ends = list(robots)
+
+    remaining = set(oracle.dirt_cells)
+    while remaining:
+        finish_time, distance, i, dirt = min(
+            (finish_times[i] + oracle.distance(ends[i], dirt) + 1, oracle.distance(ends[i], dirt), i, dirt)
+            for i in range(len(robots))
+            for dirt in remaining
+        )
+        if distance == float("inf"):
+            raise ValueError(f"No robot can reach the dirty cell at {dirt}.")
+        shares[i].append(dirt)
+        finish_times[i] = finish_time
+        ends[i] = dirt
+        remaining.remove(dirt)
+    return shares
+
+
+def make_robot_grid(world: WorldModel,
+                    robot: tuple[int, int],
+                    dirt_cells: list[tuple[int, int]]) -> Grid:
+    """
+    Copy the world's grid with only one robot and its share of the dirt on it.
+    Robots don't block each other, so the other robots' cells become empty.
+    """
+    cells = world.grid.cells.copy()
+    cells[(cells == ROBOT) | (cells == DIRTY)] = EMPTY
+    cells[robot] = ROBOT
+    for pos in dirt_cells:
+        cells[pos] = DIRTY
+    return Grid(cells)
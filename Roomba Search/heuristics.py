@@ -0,0 +1,83 @@
+from typing import Callable
+
+from SearchState import SearchState
+
+def manhattan(pos1: tuple[int, int],
+              pos2: tuple[int, int]) -> int:
+    return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+
+
+class Heuristic:
+    """
+    Estimate of the number of moves left to clean the world from a search state.
+    Every heuristic here is admissible and consistent, so A* stays optimal with a closed set.
+    """
+    def __init__(self,
+                 dirt_cells: list[tuple[int, int]],
+                 distance: Callable[[tuple[int, int], tuple[int, int]], int] = manhattan):
+        # dirt_cells[i] is the cell tracked by bit i of a state's dirt mask
+        self.dirt_cells = dirt_cells
+        self.distance = distance
+
+    def remaining(self, dirt_mask: int) -> list[tuple[int, int]]:
+        return [pos for i, pos in enumerate(self.dirt_cells) if dirt_mask >> i & 1]
+
+    def __call__(self, state: SearchState) -> int:
+        raise NotImplementedError
+
+
+class ZeroHeuristic(Heuristic):
+    """
+    Always estimates 0, which turns A* into uniform-cost search.
+    """
+    def __call__(self, state: SearchState) -> int:
+        return 0
+
+
+class FarthestDirtHeuristic(Heuristic):
+    """
+    The robot must at least reach the farthest dirty cell, and vacuum every dirty cell once.
+    """
+    def __call__(self, state: SearchState) -> int:
+        remaining = self.remaining(state.dirt_mask)
+        if not remaining:
+            return 0
+        return max(self.distance(state.pos, pos) for pos in remaining) + len(remaining)
+
+
+class MSTHeuristic(Heuristic):
+    """
+    The robot must reach the nearest dirty cell, then connect the rest, which costs at least
+    a minimum spanning tree over the remaining dirt. Vacuuming adds one move per dirty cell.
+    """
+    def __init__(self, dirt_cells, distance=manhattan):
+        super().__init__(dirt_cells, distance)
+        # MST weights only depend on the remaining dirt, so share them between states
+        self.mst_cache: dict[int, int] = dict()
+
+    def __call__(self, state: SearchState) -> int:
+        remaining = self.remaining(state.dirt_mask)
+        if not remaining:
+            return 0
+        nearest = min(self.distance(state.pos, pos) for pos in remaining)
+        return nearest + self.get_mst_weight(state.dirt_mask, remaining) + len(remaining)
+
+    def get_mst_weight(self, dirt_mask: int, remaining: list[tuple[int, int]]) -> int:
+        if dirt_mask not in self.mst_cache:
+            # Prim's algorithm on the complete graph over the remaining dirt
+            weight = 0
+            best = {pos: self.distance(remaining[0], pos) for pos in remaining[1:]}
+            while best:
+                pos = min(best, key=best.get)
+                weight += best.pop(pos)
+                for other in best:
+                    best[other] = min(best[other], self.distance(pos, other))
+            self.mst_cache[dirt_mask] = weight
+        return self.mst_cache[dirt_mask]
+
+
+heuristics: dict[str, type[Heuristic]] = {
+    "zero": ZeroHeuristic,
+    "farthest-dirt": FarthestDirtHeuristic,
+    "mst": MSTHeuristic
+}
@@ -1,21 +1,30 @@
 #!/usr/bin/env python3
 """
 make_vacuum_world.py
-Generates a random Vacuum World grid file for CS 480 - Assignment 1.
+Generates random Vacuum World grid files for CS 480 - Assignment 1.
 
 Usage:
-    python3 make_vacuum_world.py <rows> <cols> <blocked_fraction> <num_dirty>
+    python3 make_vacuum_world.py <rows> <cols> <blocked_fraction> <num_dirty> [seed]
+    python3 make_vacuum_world.py bulk <out_dir> <num_maps> <rows> <cols> <blocked_fraction> <num_dirty> <seed> [reachability]
 
 Example:
     python3 make_vacuum_world.py 5 7 0.15 3 > random-5x7.txt
+    python3 make_vacuum_world.py bulk corpus 1000 200 200 0.2 10 42 repair
 
 Parameters:
 - rows (int): Number of rows in the grid
 - cols (int): Number of columns in the grid
 - blocked_fraction (float): Probability that any given cell is blocked
 - num_dirty (int): Number of dirty cells to place
+- seed (int): Seed for the random generator, so the same arguments always give the same maps
+- out_dir (str): Directory to write the maps and their manifest.json to
+- num_maps (int): Number of maps to generate
+- reachability (str): What to do with maps where the robot can't reach every dirty cell
+   - `any` keeps them (default)
+   - `reject` generates a new map instead
+   - `repair` moves the unreachable dirt to random reachable cells
 
-Outputs to stdout:
+Outputs to stdout (or one file per map in bulk mode):
 1. Number of columns
 2. Number of rows
 3. Rows of characters (one row per line)
@@ -24,12 +33,144 @@ Outputs to stdout:
    - `*` for dirty
    - `@` for robot start (placed randomly in a non-blocked, non-dirty cell)
 """
+import os
 import sys
-import random
+import json
+import numpy as np
+
+from Grid import EMPTY, BLOCKED, DIRTY, ROBOT
+from wavefront import wavefront_bfs, UNREACHED
+
+reachability_modes = ("any", "reject", "repair")
+# give up on a map if this many attempts in a row can't be made fully reachable
+MAX_ATTEMPTS = 100
+
+def get_reachable_mask(obstacle_mask: np.ndarray, start: tuple[int, int]) -> np.ndarray:
+    """
+    Flood-fill the open cells reachable from start, with the wavefront BFS kernel.
+    """
+    return wavefront_bfs(obstacle_mask, [start]) != UNREACHED
+
+
+def generate_grid(rng: np.random.Generator, rows: int, cols: int, blocked_fraction: float, num_dirty: int) -> np.ndarray:
+    """
+    Generate one grid of cell codes, with the obstacle and dirt masks drawn as whole arrays.
+    """
+    # Randomly place blocked cells based on probability
+    cells = np.full((rows, cols), EMPTY, dtype=np.uint8)
+    cells[rng.random((rows, cols)) < blocked_fraction] = BLOCKED
+
+    # Place dirty cells at random valid positions (if possible),
+    # then the robot start in one remaining valid position, if any remain
+    valid_positions = np.flatnonzero(cells == EMPTY)
+    dirty_count = min(num_dirty, len(valid_positions))
+    chosen = rng.choice(valid_positions, size=min(dirty_count + 1, len(valid_positions)), replace=False)
+    cells.flat[chosen[:dirty_count]] = DIRTY
+    if len(chosen) > dirty_count:
+        cells.flat[chosen[dirty_count]] = ROBOT
+    return cells
+
+
+def make_reachable(rng: np.random.Generator, cells: np.ndarray, reachability: str) -> bool:
+    """
+    Check that the robot can reach every dirty cell, repairing the grid in place if asked to.
+    Returns whether the grid is acceptable.
+    """
+    if reachability == "any":
+        return True
+    robots = np.argwhere(cells == ROBOT)
+    if not len(robots):
+        return not (cells == DIRTY).any()
+    reachable = get_reachable_mask(cells == BLOCKED, tuple(robots[0]))
+    stranded = np.flatnonzero((cells == DIRTY) & ~reachable)
+    if not len(stranded):
+        return True
+    if reachability == "reject":
+        return False
+
+    # move each stranded dirty cell to a reachable empty cell
+    free = np.flatnonzero((cells == EMPTY) & reachable)
+    if len(free) < len(stranded):
+        return False
+    cells.flat[stranded] = EMPTY
+    cells.flat[rng.choice(free, size=len(stranded), replace=False)] = DIRTY
+    return True
+
+
+def format_grid(cells: np.ndarray) -> bytes:
+    rows, cols = cells.shape
+    newlines = np.full((rows, 1), ord("\n"), dtype=np.uint8)
+    return f"{cols}\n{rows}\n".encode() + np.hstack((cells, newlines)).tobytes()
+
+
+def generate_corpus(out_dir: str, num_maps: int, rows: int, cols: int, blocked_fraction: float,
+                    num_dirty: int, seed: int, reachability: str = "any") -> dict:
+    """
+    Write num_maps maps and a manifest.json describing them to out_dir.
+    Map i gets its own child seed, so it comes out the same no matter how many maps are generated.
+    """
+    if reachability not in reachability_modes:
+        raise ValueError(f"Unknown reachability mode: {reachability}. Supported modes: {', '.join(reachability_modes)}.")
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {
+        "rows": rows,
+        "cols": cols,
+        "blocked_fraction": blocked_fraction,
+        "num_dirty": num_dirty,
+        "seed": seed,
+        "reachability": reachability,
+        "maps": []
+    }
+    for i, child_seed in enumerate(np.random.SeedSequence(seed).spawn(num_maps)):
+        rng = np.random.default_rng(child_seed)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            cells = generate_grid(rng, rows, cols, blocked_fraction, num_dirty)
+            if make_reachable(rng, cells, reachability):
+                break
+        else:
+            raise ValueError(f"Could not generate map {i} with every dirty cell reachable in {MAX_ATTEMPTS} attempts.")
+
+        file_name = f"map-{i:05d}.txt"
+        with open(os.path.join(out_dir, file_name), "wb") as file:
+            file.write(format_grid(cells))
+        manifest["maps"].append({
+            "file": file_name,
+            "index": i,
+            "attempts": attempt,
+            "num_blocked": int((cells == BLOCKED).sum()),
+            "num_dirty": int((cells == DIRTY).sum())
+        })
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+def bulk_main(argv: list[str]):
+    if len(argv) not in {9, 10}:
+        print("Usage: python3 make_vacuum_world.py bulk <out_dir> <num_maps> <rows> <cols> <blocked_fraction> <num_dirty> <seed> [reachability]")
+        sys.exit(1)
+    manifest = generate_corpus(
+        out_dir=argv[2],
+        num_maps=int(argv[3]),
+        rows=int(argv[4]),
+        cols=int(argv[5]),
+        blocked_fraction=float(argv[6]),
+        num_dirty=int(argv[7]),
+        seed=int(argv[8]),
+        reachability=argv[9] if len(argv) == 10 else "any"
+    )
+    print(f"Wrote {len(manifest['maps'])} maps to {argv[2]}")
+
 
 def main():
-    if len(sys.argv) != 5:
-        print("Usage: python3 make_vacuum_world.py <rows> <cols> <blocked_fraction> <num_dirty>")
+    if len(sys.argv) > 1 and sys.argv[1] == "bulk":
+        bulk_main(sys.argv)
+        return
+
+    if len(sys.argv) not in {5, 6}:
+        print("Usage: python3 make_vacuum_world.py <rows> <cols> <blocked_fraction> <num_dirty> [seed]")
+        print("       python3 make_vacuum_world.py bulk <out_dir> <num_maps> <rows> <cols> <blocked_fraction> <num_dirty> <seed> [reachability]")
         sys.exit(1)
 
     # Parse arguments
@@ -37,48 +178,12 @@ def main():
     cols = int(sys.argv[2])
     blocked_fraction = float(sys.argv[3])
     num_dirty = int(sys.argv[4])
+    seed = int(sys.argv[5]) if len(sys.argv) == 6 else None
 
-    # Initialize an empty grid with '_'
-    grid = [['_' for _ in range(cols)] for _ in range(rows)]
+    cells = generate_grid(np.random.default_rng(seed), rows, cols, blocked_fraction, num_dirty)
 
-    # Randomly place blocked cells based on probability
-    for r in range(rows):
-        for c in range(cols):
-            if random.random() < blocked_fraction:
-                grid[r][c] = '#'
-
-    # Collect valid positions (non-blocked) for potential dirty cells and start location
-    valid_positions = [
-        (r, c) for r in range(rows) for c in range(cols)
-        if grid[r][c] == '_'
-    ]
-
-    # Place dirty cells at random valid positions (if possible)
-    # Shuffle the list of valid positions to pick them randomly
-    random.shuffle(valid_positions)
-    dirty_count = min(num_dirty, len(valid_positions))
-    for i in range(dirty_count):
-        r, c = valid_positions[i]
-        grid[r][c] = '*'
-
-    # Update the valid positions after dirty placement (can't overwrite dirty)
-    valid_positions = [
-        (r, c) for r, c in valid_positions[dirty_count:]
-        if grid[r][c] == '_'
-    ]
-
-    # Place the robot start in one remaining valid position, if any remain
-    if len(valid_positions) > 0:
-        r_start, c_start = random.choice(valid_positions)
-        grid[r_start][c_start] = '@'
-
-    # Print number of columns and rows
-    print(cols)
-    print(rows)
-
-    # Print the rows of the grid from top to bottom
-    for r in range(rows):
-        print("".join(grid[r]))
+    # Print number of columns and rows, then the rows of the grid from top to bottom
+    sys.stdout.write(format_grid(cells).decode("ascii"))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+plan_client.py
+Asks a running plan_server.py for a plan and prints it like planner.py does, without paying
+for interpreter startup, imports and world parsing in a fresh planner process every time.
+
+Usage:
+    python3 plan_client.py [algorithm] [world-file] [heuristic]
+
+The server's address is read from PLANNER_ADDRESS: host:port for TCP, or the path of a Unix socket.
+"""
+import os
+import sys
+import json
+import asyncio
+
+DEFAULT_ADDRESS = "127.0.0.1:4800"
+
+def parse_address(address:str) -> tuple[str, int] | None:
+    """
+    Split a host:port TCP address into its parts, or return None for a Unix socket path.
+    """
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return host, int(port)
+    return None
+
+
+async def open_connection(address:str) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    tcp_address = parse_address(address)
+    if tcp_address is not None:
+        return await asyncio.open_connection(*tcp_address)
+    return await asyncio.open_unix_connection(address)
+
+
+async def request_plan(address:str, world_file:str, algorithm:str, heuristic:str="mst") -> dict:
+    """
+    Send one plan request, and wait for the server's record of it.
+    """
+    reader, writer = await open_connection(address)
+    try:
+        request = {"world_file": os.path.abspath(world_file), "algorithm": algorithm, "heuristic": heuristic}
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def main():
+    if len(sys.argv) not in {3, 4}:
+        print("Usage: python3 plan_client.py [algorithm] [world-file] [heuristic]")
+        sys.exit(1)
+    algorithm = sys.argv[1]
+    world_file = sys.argv[2]
+    heuristic = sys.argv[3] if len(sys.argv) == 4 else "mst"
+
+    address = os.environ.get("PLANNER_ADDRESS", DEFAULT_ADDRESS)
+    record = asyncio.run(request_plan(address, world_file, algorithm, heuristic))
+    if record["status"] != "ok":
+        print(record["error"])
+        sys.exit(1)
+
+    if len(record["paths"]) == 1:
+      for r in record["path"]:
+        print(r)
+    else:
+      for i, path in enumerate(record["paths"]):
+        print(f"Robot {i}: {' '.join(path)}")
+      print(f"Makespan: {record['makespan']} moves.")
+    print(f"{record['nodes_generated']} nodes generated.")
+    print(f"{record['nodes_expanded']} nodes expanded.")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+plan_server.py
+A local planning service, so controllers don't start a fresh planner process for every plan.
+
+Each connection sends one JSON request per line,
+    {"world_file": "...", "algorithm": "...", "heuristic": "..."}
+and gets one JSON record per line back: World.search's output with "status": "ok", "cached" and
+"coalesced", or "status": "error" and "error". Searches run on a pool of worker processes. Concurrent
+requests for the same map (by grid hash), algorithm and heuristic share one search, and recent results
+are kept in an LRU cache. Maps are loaded and hashed off the event loop, once for all the concurrent
+requests for a file, and only again once the file's modification time or size changes.
+
+Usage:
+    python3 plan_server.py [address] [workers] [cache-size]
+
+The address is host:port for TCP, or the path of a Unix socket (127.0.0.1:4800 by default).
+"""
+import os
+import sys
+import json
+import signal
+import asyncio
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from World import World, search_robot
+from plan_client import DEFAULT_ADDRESS, parse_address
+
+def get_file_key(world_file:str) -> tuple[str, int, int]:
+    file_stat = os.stat(world_file)
+    return world_file, file_stat.st_mtime_ns, file_stat.st_size
+
+
+def load_world(world_file:str) -> tuple[World, str]:
+    # runs on a thread, so parsing and hashing a big map doesn't hold up other connections
+    world = World.load(world_file)
+    return world, world.get_grid_hash()
+
+
+class PlanServer:
+    """
+    Serves plan requests, coalescing identical ones and caching their results.
+    """
+    def __init__(self, workers:int=None, cache_size:int=128):
+        # like planner.py, fork workers from a server that has already imported the planner
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["World"])
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        # (path, modification time, size) -> grid hash, so unchanged files aren't parsed again
+        self.grid_hashes: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        # (grid hash, algorithm, heuristic) -> output, least recently used first
+        self.cache: OrderedDict[tuple[str, str, str], dict] = OrderedDict()
+        self.cache_size = cache_size
+        # searches still running, which identical requests wait on instead of starting their own
+        self.pending: dict[tuple[str, str, str], asyncio.Task] = dict()
+        # the same for loads, so concurrent requests for a new file parse it only once
+        self.pending_loads: dict[tuple[str, int, int], asyncio.Task] = dict()
+        self.loads = 0
+        self.searches = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+
+    async def load(self, world_file:str, file_key:tuple[str, int, int]) -> tuple[World, str]:
+        """
+        Load and hash a world file on a thread, or wait for the load already running for the same file.
+        """
+        if file_key not in self.pending_loads:
+            self.pending_loads[file_key] = asyncio.create_task(self.read_world(world_file, file_key))
+        return await asyncio.shield(self.pending_loads[file_key])
+
+    async def read_world(self, world_file:str, file_key:tuple[str, int, int]) -> tuple[World, str]:
+        self.loads += 1
+        try:
+            world, grid_hash = await asyncio.get_running_loop().run_in_executor(None, load_world, world_file)
+        finally:
+            del self.pending_loads[file_key]
+        self.grid_hashes[file_key] = grid_hash
+        if len(self.grid_hashes) > self.cache_size:
+            self.grid_hashes.popitem(last=False)
+        return world, grid_hash
+
+    async def plan(self, world_file:str, algorithm:str, heuristic:str="mst") -> dict:
+        """
+        Plan on one world file, reporting errors in the record instead of raising them.
+        """
+        try:
+            file_key = get_file_key(world_file)
+            world = None
+            if file_key in self.grid_hashes:
+                self.grid_hashes.move_to_end(file_key)
+                grid_hash = self.grid_hashes[file_key]
+            else:
+                world, grid_hash = await self.load(world_file, file_key)
+
+            key = (grid_hash, algorithm, heuristic)
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.cache_hits += 1
+                return {"status": "ok", "cached": True, "coalesced": False, **self.cache[key]}
+
+            if key in self.pending:
+                self.coalesced += 1
+                output = await asyncio.shield(self.pending[key])
+                return {"status": "ok", "cached": False, "coalesced": True, **output}
+
+            self.searches += 1
+            self.pending[key] = asyncio.create_task(self.search(key, world_file, world))
+            output = await asyncio.shield(self.pending[key])
+            return {"status": "ok", "cached": False, "coalesced": False, **output}
+        except Exception as e:
+            return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+
+    async def search(self, key:tuple[str, str, str], world_file:str, world:World=None) -> dict:
+        """
+        Run one search on the pool and cache its output. The world is loaded first if its hash was cached.
+        """
+        try:
+            if world is None:
+                world, grid_hash = await self.load(world_file, get_file_key(world_file))
+                if grid_hash != key[0]:
+                    raise ValueError(f"World file {world_file} changed while it was being planned.")
+            _, algorithm, heuristic = key
+            # fleets are solved within the worker: the pool already keeps every core busy across
+            # requests, and a pool per fleet would oversubscribe them and pay its startup every time
+            output = await asyncio.get_running_loop().run_in_executor(
+                self.executor, search_robot, world.grid, algorithm, {"heuristic": heuristic, "workers": 1}
+            )
+        finally:
+            del self.pending[key]
+        self.cache[key] = output
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return output
+
+    async def handle(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    record = await self.plan(request["world_file"], request["algorithm"], request.get("heuristic", "mst"))
+                except (ValueError, KeyError, TypeError) as e:
+                    record = {"status": "error", "error": f"Bad request: {type(e).__name__}: {e}"}
+                writer.write(json.dumps(record).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self, address:str=DEFAULT_ADDRESS) -> asyncio.AbstractServer:
+        tcp_address = parse_address(address)
+        if tcp_address is not None:
+            return await asyncio.start_server(self.handle, *tcp_address)
+        if os.path.exists(address):
+            os.remove(address)
+        return await asyncio.start_unix_server(self.handle, address)
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+async def serve(address:str, workers:int=None, cache_size:int=128):
+    """
+    Serve until interrupted or terminated.
+    """
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+    plan_server = PlanServer(workers, cache_size)
+    try:
+        async with await plan_server.start(address):
+            print(f"Planning on {address}", flush=True)
+            await stop.wait()
+    finally:
+        plan_server.close()
+
+
+def main():
+    if len(sys.argv) > 4:
+        print("Usage: python3 plan_server.py [address] [workers] [cache-size]")
+        sys.exit(1)
+    address = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ADDRESS
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    cache_size = int(sys.argv[3]) if len(sys.argv) > 3 else 128
+    asyncio.run(serve(address, workers, cache_size))
+
+if __name__ == "__main__":
+    main()
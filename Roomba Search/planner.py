@@ -1,25 +1,134 @@
+import os
 import sys
 import re
-from World import World
+import glob
+import json
+import time
+import signal
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from World import World, algorithms
 
-def main(algorithm:str="uniform-cost", world_file:str="random-5x7.txt"):
-    if len(sys.argv) != 3:
-        print("Usage: python3 planner.py [algorithm] [world-file]")
+def load_world(world_file:str) -> World:
+    # memory-map the world file, detecting its encoding
+    return World.load(world_file)
+
+
+def raise_timeout(signum, frame):
+    raise TimeoutError()
+
+
+def plan(world_file:str, algorithm:str, heuristic:str="mst", timeout:float=None) -> dict:
+    """
+    Plan on one world file with one algorithm, and summarize the run as a JSON-ready record.
+    Errors and timeouts are reported in the record's status instead of being raised.
+    """
+    record = {"world_file": world_file, "algorithm": algorithm}
+    start = time.perf_counter()
+    if timeout:
+        # SIGALRM interrupts the search from inside this process once the budget is spent
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        output = load_world(world_file).search(algorithm, heuristic)
+        record["status"] = "ok"
+        record["path_length"] = sum(map(len, output["paths"]))
+        record["makespan"] = output["makespan"]
+        record["nodes_generated"] = output["nodes_generated"]
+        record["nodes_expanded"] = output["nodes_expanded"]
+        record["optimal"] = output["optimal"]
+    except TimeoutError:
+        record["status"] = "timeout"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    record["wall_time"] = time.perf_counter() - start
+    # each job gets its own worker process, so this is the job's peak
+    record["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return record
+
+
+def find_world_files(pattern:str) -> list[str]:
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.txt")
+    return sorted(glob.glob(pattern))
+
+
+def plan_batch(world_files:list[str], batch_algorithms:list[str], heuristic:str="mst",
+               timeout:float=None, workers:int=None):
+    """
+    Plan every (world file, algorithm) pair on a process pool, yielding records as they finish.
+    """
+    # workers are forked from a server that has already imported the planner,
+    # and are replaced after every job so peak memory is measured per job
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["World"])
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=context,
+                             max_tasks_per_child=1) as executor:
+        futures = [
+            executor.submit(plan, world_file, algorithm, heuristic, timeout)
+            for world_file in world_files
+            for algorithm in batch_algorithms
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def batch_main(argv:list[str]):
+    if len(argv) not in {4, 5, 6}:
+        print("Usage: python3 planner.py batch [world-dir-or-glob] [algorithm,...] [timeout-seconds] [workers]")
+        sys.exit(1)
+    world_files = find_world_files(argv[2])
+    batch_algorithms = argv[3].split(",")
+    for algorithm in batch_algorithms:
+        if algorithm not in algorithms:
+            print(f"Unknown algorithm: {algorithm}. Supported algorithms: {', '.join(algorithms)}.")
+            sys.exit(1)
+    timeout = float(argv[4]) if len(argv) >= 5 else None
+    workers = int(argv[5]) if len(argv) == 6 else None
+
+    # stream one JSON record per line as soon as each job is done
+    for record in plan_batch(world_files, batch_algorithms, timeout=timeout, workers=workers):
+        print(json.dumps(record), flush=True)
+
+
+def main(algorithm:str="uniform-cost", world_file:str="random-5x7.txt", heuristic:str="mst"):
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        batch_main(sys.argv)
+        return
+
+    if len(sys.argv) not in {3, 4}:
+        print("Usage: python3 planner.py [algorithm] [world-file] [heuristic]")
+        print("       python3 planner.py batch [world-dir-or-glob] [algorithm,...] [timeout-seconds] [workers]")
+        print(f"Algorithms: {', '.join(algorithms)}")
         sys.exit(1)
     algorithm = sys.argv[1]
     world_file = sys.argv[2]
+    # only used by a-star
+    if len(sys.argv) == 4:
+        heuristic = sys.argv[3]
 
-    # Load the world file's contents
-    with open(world_file, 'r', encoding='utf-16') as file:
-        contents = file.read().strip()
+    world = load_world(world_file)
+    # a single robot's moves are printed as soon as each leg of the plan is final
+    single_robot = len(world.get_bot_positions()) == 1
+    for event in world.search_stream(algorithm, heuristic):
+      if event["event"] == "leg" and single_robot:
+        for r in event["moves"]:
+          print(r, flush=True)
+      elif event["event"] == "done":
+        output = event
 
-    world = World(contents)
-    output = world.search(algorithm)
-    
-    for r in output["path"]:
-      print(r)
+    if not single_robot:
+      for i, path in enumerate(output["paths"]):
+        print(f"Robot {i}: {' '.join(path)}")
+      print(f"Makespan: {output['makespan']} moves.")
     print(f"{output['nodes_generated']} nodes generated.")
     print(f"{output['nodes_expanded']} nodes expanded.")
 
 if __name__ == "__main__":
-  main()
\ No newline at end of file
+  main()
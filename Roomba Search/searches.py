@@ -1,71 +1,696 @@
-from copy import deepcopy
+from collections import OrderedDict
+from itertools import count
+from time import perf_counter
+from typing import Iterator
 import heapq as hq
+import numpy as np
 
-from Agent import Agent
-from Action import Action
-
-def dfs(agent: Agent) -> Agent:
-    # if there're no dirty cells left, return the agent
-    if not agent.world.dirty_cells:
-        return agent
-
-    # if the agent is on a dirty cell, clean it and recurse
-    if agent.world.is_dirty(agent.pos):
-        agent.execute_action(Action("V", agent.tree_node))
-        return dfs(agent)
-
-    # expand children if not already expanded
-    agent.expand_children()
-
-    # while there are actions to try
-    while agent.tree_node.available_acts:
-        action = agent.tree_node.available_acts.pop()
-        agent.execute_action(action)
-        agent = dfs(agent)
-    
-    # if all actions are exhausted, backtrack to the previous node
-    if agent.tree_node.parent is not None:
-        agent.backtrack()
-        return agent
-    
-    # if no valid path found, return None
-    raise ValueError("No valid path found in DFS.")
-
-def ucs(agent: Agent) -> tuple[int, int, Agent]:
-    nodes_expanded = 0
-    nodes_generated = 0
-
-    # use a priority queue
-    pq: list[tuple[int, Agent]] = list()
-    hq.heapify(pq)
-    hq.heappush(pq, agent)
+from WorldModel import WorldModel
+from SearchState import SearchState
+from NodePool import NodePool
+from heuristics import Heuristic, heuristics
+from DistanceOracle import DistanceOracle
+from HierarchicalMap import HierarchicalMap
+from CorridorGraph import CorridorGraph
+from SearchStats import SearchStats
+from Frontier import HeapFrontier, BucketFrontier
+from config import offset_map
+
+# exact BFS distances, or faster but slightly longer ones from a cluster hierarchy for huge maps
+distance_providers = {
+    "exact": DistanceOracle,
+    "hierarchical": HierarchicalMap
+}
+
+# rules for skipping states that can't lead to a better plan than some other state does:
+# - vacuum-on-pass: on a dirty cell, vacuuming right away is never worse than leaving and coming back
+# - dominance: a state is no better than a closed one on the same cell with less dirt left and no greater cost;
+#   without vacuum-on-pass, dirtier states are always reached first, so this only pays off alongside it
+# - commuting-moves: a vertical move right after a horizontal one could have been made first, if that cell is open
+pruning_rules = ("vacuum-on-pass", "dominance", "commuting-moves")
+
+def check_pruning(pruning: tuple[str, ...]):
+    for rule in pruning:
+        if rule not in pruning_rules:
+            raise ValueError(f"Unknown pruning rule: {rule}. Supported pruning rules: {', '.join(pruning_rules)}.")
+
+def get_distance_provider(world: WorldModel, distances: str) -> DistanceOracle | HierarchicalMap:
+    if distances not in distance_providers:
+        raise ValueError(f"Unknown distance provider: {distances}. Supported providers: {', '.join(distance_providers)}.")
+    return distance_providers[distances].for_world(world)
+
+def get_start_state(world: WorldModel,
+                    pool: NodePool | None = None) -> tuple[SearchState, dict[tuple[int, int], int]]:
+    """
+    Build the root state of the vacuum-world state space, along with the dirt cell -> bit map
+    used to read its dirt mask. If a node pool is given, it is reset for the new search.
+    """
+    dirt_index = world.get_dirt_index()
+    if pool is not None:
+        pool.reset()
+    new_state = SearchState if pool is None else pool.allocate
+    start = new_state(world.get_bot_pos_from_grid(), (1 << len(dirt_index)) - 1)
+    return start, dirt_index
+
+def expand_state(world: WorldModel,
+                 state: SearchState,
+                 dirt_index: dict[tuple[int, int], int],
+                 pool: NodePool | None = None,
+                 closed: set[tuple[tuple[int, int], int]] | None = None,
+                 stats: SearchStats | None = None,
+                 pruning: tuple[str, ...] = ()) -> list[SearchState]:
+    """
+    Generate the states reachable from the given state with a single move or vacuum,
+    allocating them from the node pool if one is given. Children whose (pos, dirt mask)
+    is in closed are skipped without being allocated, as are children ruled out by the
+    vacuum-on-pass and commuting-moves pruning rules. The world is only read, never modified.
+    """
+    new_state = SearchState if pool is None else pool.allocate
+    closed = closed if closed is not None else ()
+    clock = stats.clock if stats is not None else None
+
+    # find the legal, unclosed successors first, then allocate them, so both can be timed
+    start_time = clock() if clock else 0
+    successors = list()
+    # vacuum if the robot is on a cell that is still dirty
+    bit = dirt_index.get(state.pos)
+    if bit is not None and state.dirt_mask >> bit & 1:
+        successors.append(("V", state.pos, state.dirt_mask & ~(1 << bit)))
+    # move to each open neighboring cell
+    for move, new_pos in world.get_neighbor_table().get_neighbors(state.pos):
+        successors.append((move, new_pos, state.dirt_mask))
+    if pruning:
+        successors = prune_successors(world, state, dirt_index, successors, pruning, stats)
+    num_legal = len(successors)
+    if closed:
+        successors = [successor for successor in successors if (successor[1], successor[2]) not in closed]
+    legal_time = clock() if clock else 0
+
+    children = [new_state(pos, dirt_mask, state, move, state.cost + 1) for move, pos, dirt_mask in successors]
+
+    if stats is not None:
+        stats.duplicates += num_legal - len(successors)
+        stats.nodes_generated += len(children)
+        stats.add_time("legality", legal_time - start_time)
+        stats.add_time("copying", clock() - legal_time)
+    return children
+
+def prune_successors(world: WorldModel,
+                     state: SearchState,
+                     dirt_index: dict[tuple[int, int], int],
+                     successors: list[tuple[str, tuple[int, int], int]],
+                     pruning: tuple[str, ...],
+                     stats: SearchStats | None = None) -> list[tuple[str, tuple[int, int], int]]:
+    # vacuuming is always listed first, so a dirty cell's successors start with a V
+    if "vacuum-on-pass" in pruning and successors and successors[0][0] == "V":
+        if stats is not None:
+            stats.add_pruned("vacuum-on-pass", len(successors) - 1)
+        return successors[:1]
+
+    if "commuting-moves" in pruning and state.move in {"E", "W"}:
+        parent_pos = (state.pos[0] - offset_map[state.move][0], state.pos[1] - offset_map[state.move][1])
+        kept = list()
+        for successor in successors:
+            move = successor[0]
+            if move in {"N", "S"}:
+                # the same cell can be reached by moving vertically first, through this cell instead;
+                # it must not be dirt that is still left, or that path would reach a different state
+                other_pos = (parent_pos[0] + offset_map[move][0], parent_pos[1] + offset_map[move][1])
+                bit = dirt_index.get(other_pos)
+                if world.is_open(other_pos) and (bit is None or not state.dirt_mask >> bit & 1):
+                    continue
+            kept.append(successor)
+        if stats is not None:
+            stats.add_pruned("commuting-moves", len(successors) - len(kept))
+        return kept
+    return successors
+
+def is_dominated(state: SearchState,
+                 closed_masks: dict[tuple[int, int], list[tuple[int, int]]]) -> bool:
+    """
+    Check whether a closed state on the same cell has a subset of this state's dirt left, at no greater cost.
+    """
+    return any(
+        mask & ~state.dirt_mask == 0 and cost <= state.cost
+        for mask, cost in closed_masks.get(state.pos, ())
+    )
+
+def depth_limited_dfs(world: WorldModel,
+                      depth_limit: int | None = None,
+                      pool: NodePool | None = None,
+                      stats: SearchStats | None = None) -> tuple[list[str] | None, bool]:
+    """
+    Run DFS with an explicit stack instead of recursion. Each frame on the stack is an
+    iterator over the unexplored children of one state on the current branch.
+
+    Returns the moves to the first goal found (or None), and whether any branch was
+    cut off by the depth limit. Work is counted in stats.
+    """
+    stats = stats if stats is not None else SearchStats()
+    clock = stats.clock
+    cutoff = False
+
+    start, dirt_index = get_start_state(world, pool)
+    if not start.dirt_mask:
+        return [], cutoff
+
+    # (pos, dirt mask) -> shallowest depth it has been reached at
+    visited: dict[tuple[tuple[int, int], int], int] = {start.key: 0}
+    stack = [iter(expand_state(world, start, dirt_index, pool, stats=stats))]
+    stats.on_expand(len(stack), len(visited))
+
+    while stack:
+        state = next(stack[-1], None)
+        # backtrack once every child of the top frame has been tried
+        if state is None:
+            stack.pop()
+            continue
+
+        # without a depth limit a state is never revisited; with one, it is
+        # revisited when reached on a shorter branch, which may now fit under the limit
+        if state.key in visited and (depth_limit is None or visited[state.key] <= state.cost):
+            stats.duplicates += 1
+            continue
+        visited[state.key] = state.cost
+
+        # if the robot has cleaned all dirty cells, return the branch that got it here
+        if not state.dirt_mask:
+            return state.get_move_seq(), cutoff
+
+        if depth_limit is not None and state.cost >= depth_limit:
+            cutoff = True
+            continue
+
+        start_time = clock()
+        children = expand_state(world, state, dirt_index, pool, stats=stats)
+        frontier_time = clock()
+        stack.append(iter(children))
+        stats.add_time("frontier", clock() - frontier_time)
+        stats.add_time("expansion", frontier_time - start_time)
+        stats.on_expand(len(stack), len(visited))
+
+    return None, cutoff
+
+def dfs(world: WorldModel,
+        depth_limit: int | None = None,
+        pool: NodePool | None = None,
+        stats: SearchStats | None = None) -> tuple[int, int, list[str]]:
+    stats = stats if stats is not None else SearchStats()
+    move_seq, _ = depth_limited_dfs(world, depth_limit, pool, stats)
+    if move_seq is None:
+        raise ValueError("No valid path found in DFS.")
+    return stats.nodes_expanded, stats.nodes_generated, move_seq
+
+def iddfs(world: WorldModel,
+          max_depth: int | None = None,
+          pool: NodePool | None = None,
+          stats: SearchStats | None = None) -> tuple[int, int, list[str]]:
+    """
+    Run depth-limited DFS with limits 0, 1, 2, ... so the first plan found is also the shortest.
+    The counters add up the work done by every iteration.
+    """
+    stats = stats if stats is not None else SearchStats()
+
+    depth_limit = 0
+    while max_depth is None or depth_limit <= max_depth:
+        # no plan is shorter than a limit that is still being searched
+        stats.bound = depth_limit
+        move_seq, cutoff = depth_limited_dfs(world, depth_limit, pool, stats)
+        if move_seq is not None:
+            return stats.nodes_expanded, stats.nodes_generated, move_seq
+        # if no branch reached the limit, a deeper search won't find anything either
+        if not cutoff:
+            break
+        depth_limit += 1
+
+    raise ValueError("No valid path found in iterative deepening DFS.")
+
+def ucs(world: WorldModel,
+        pool: NodePool | None = None,
+        stats: SearchStats | None = None,
+        frontier_type: type[HeapFrontier | BucketFrontier] = BucketFrontier,
+        pruning: tuple[str, ...] = ()) -> tuple[int, int, list[str]]:
+    """
+    Expand states in order of cost. Every action costs 1, so by default the frontier is a
+    bucket queue with O(1) pushes and pops; a HeapFrontier works for any costs.
+    The given pruning rules are applied, and what each one skips is counted in stats.
+    """
+    check_pruning(pruning)
+    stats = stats if stats is not None else SearchStats()
+    clock = stats.clock
+
+    start, dirt_index = get_start_state(world, pool)
+    frontier = frontier_type()
+    frontier.push(start.cost, start)
+    # (pos, dirt mask) pairs that have already been expanded
+    closed: set[tuple[tuple[int, int], int]] = set()
+    # pos -> (dirt mask, cost) of each closed state on it, for the dominance rule
+    closed_masks: dict[tuple[int, int], list[tuple[int, int]]] = dict()
+
+    while frontier:
+        start_time = clock()
+        state = frontier.pop()
+        stats.add_time("frontier", clock() - start_time)
+        if state.key in closed:
+            stats.duplicates += 1
+            continue
+        if "dominance" in pruning:
+            if is_dominated(state, closed_masks):
+                stats.add_pruned("dominance")
+                continue
+            closed_masks.setdefault(state.pos, []).append((state.dirt_mask, state.cost))
+        stats.bound = state.cost
+
+        # if the robot has cleaned all dirty cells, return the moves that got it here
+        if not state.dirt_mask:
+            return stats.nodes_expanded, stats.nodes_generated, state.get_move_seq()
+
+        closed.add(state.key)
+        start_time = clock()
+        children = expand_state(world, state, dirt_index, pool, closed, stats, pruning)
+        frontier_time = clock()
+        for child in children:
+            frontier.push(child.cost, child)
+        stats.add_time("frontier", clock() - frontier_time)
+        stats.add_time("expansion", frontier_time - start_time)
+        stats.on_expand(len(frontier), len(closed))
+
+    raise ValueError("No valid path found in UCS.")
+
+def astar(world: WorldModel,
+          heuristic: str | type[Heuristic] = "mst",
+          pool: NodePool | None = None,
+          stats: SearchStats | None = None,
+          distances: str = "exact",
+          pruning: tuple[str, ...] = ()) -> tuple[int, int, list[str]]:
+    """
+    A* ordered by f = g + h. The heuristic measures distances with the given provider; only
+    exact distances keep it admissible, so hierarchical ones trade optimality for speed.
+    The given pruning rules are applied like in UCS.
+    """
+    check_pruning(pruning)
+    if isinstance(heuristic, str):
+        if heuristic not in heuristics:
+            raise ValueError(f"Unknown heuristic: {heuristic}. Supported heuristics: {', '.join(heuristics)}.")
+        heuristic = heuristics[heuristic]
+
+    stats = stats if stats is not None else SearchStats()
+    clock = stats.clock
+
+    start, dirt_index = get_start_state(world, pool)
+    # estimate with maze distances instead of Manhattan distances
+    oracle = get_distance_provider(world, distances)
+    estimate = heuristic(sorted(dirt_index, key=dirt_index.get), oracle.distance)
+    tie_breaker = count()
+    # order by f = g + h, preferring states closer to the goal (smaller h) on ties
+    h = estimate(start)
+    if h == float("inf"):
+        raise ValueError("No valid path found in A*.")
+    pq: list[tuple[int, int, int, SearchState]] = [(start.cost + h, h, next(tie_breaker), start)]
+    closed: set[tuple[tuple[int, int], int]] = set()
+    closed_masks: dict[tuple[int, int], list[tuple[int, int]]] = dict()
+
+    while pq:
+        start_time = clock()
+        f, _, _, state = hq.heappop(pq)
+        stats.add_time("frontier", clock() - start_time)
+        if state.key in closed:
+            stats.duplicates += 1
+            continue
+        if "dominance" in pruning:
+            if is_dominated(state, closed_masks):
+                stats.add_pruned("dominance")
+                continue
+            closed_masks.setdefault(state.pos, []).append((state.dirt_mask, state.cost))
+        stats.bound = f
+
+        if not state.dirt_mask:
+            return stats.nodes_expanded, stats.nodes_generated, state.get_move_seq()
+
+        closed.add(state.key)
+        start_time = clock()
+        children = expand_state(world, state, dirt_index, pool, closed, stats, pruning)
+        heuristic_time = clock()
+        estimates = [estimate(child) for child in children]
+        frontier_time = clock()
+        for child, h in zip(children, estimates):
+            # skip states that have cut themselves off from some of the dirt
+            if h == float("inf"):
+                continue
+            hq.heappush(pq, (child.cost + h, h, next(tie_breaker), child))
+        stats.add_time("frontier", clock() - frontier_time)
+        stats.add_time("heuristic", frontier_time - heuristic_time)
+        stats.add_time("expansion", heuristic_time - start_time)
+        stats.on_expand(len(pq), len(closed))
+
+    raise ValueError("No valid path found in A*.")
+
+def contracted_astar(world: WorldModel,
+                     heuristic: str | type[Heuristic] = "mst",
+                     stats: SearchStats | None = None,
+                     distances: str = "exact") -> tuple[int, int, list[str]]:
+    """
+    A* over the world's corridor graph instead of its cells. Moving along an edge costs its length,
+    so costs are no longer all 1, and the frontier is a heap. The edges' moves are spliced back
+    together into cell-level moves at the end.
+    """
+    if isinstance(heuristic, str):
+        if heuristic not in heuristics:
+            raise ValueError(f"Unknown heuristic: {heuristic}. Supported heuristics: {', '.join(heuristics)}.")
+        heuristic = heuristics[heuristic]
+
+    stats = stats if stats is not None else SearchStats()
+    clock = stats.clock
+
+    graph = CorridorGraph.for_world(world)
+    start, dirt_index = get_start_state(world)
+    oracle = get_distance_provider(world, distances)
+    estimate = heuristic(sorted(dirt_index, key=dirt_index.get), oracle.distance)
+    h = estimate(start)
+    if h == float("inf"):
+        raise ValueError("No valid path found in contracted A*.")
+    frontier = HeapFrontier()
+    # order by f = g + h, preferring states closer to the goal (smaller h) on ties
+    frontier.push((start.cost + h, h), start)
+    closed: set[tuple[tuple[int, int], int]] = set()
+
+    while frontier:
+        start_time = clock()
+        f, _ = frontier.peek_priority()
+        state = frontier.pop()
+        stats.add_time("frontier", clock() - start_time)
+        if state.key in closed:
+            stats.duplicates += 1
+            continue
+        stats.bound = f
+
+        if not state.dirt_mask:
+            # each edge's move is the whole string of moves along it
+            return stats.nodes_expanded, stats.nodes_generated, list("".join(state.get_move_seq()))
+
+        closed.add(state.key)
+        start_time = clock()
+        children = list()
+        bit = dirt_index.get(state.pos)
+        if bit is not None and state.dirt_mask >> bit & 1:
+            children.append(SearchState(state.pos, state.dirt_mask & ~(1 << bit), state, "V", state.cost + 1))
+        for neighbor, (length, moves) in graph.get_edges(state.pos).items():
+            if (neighbor, state.dirt_mask) in closed:
+                stats.duplicates += 1
+                continue
+            children.append(SearchState(neighbor, state.dirt_mask, state, moves, state.cost + length))
+        stats.nodes_generated += len(children)
+        heuristic_time = clock()
+        estimates = [estimate(child) for child in children]
+        frontier_time = clock()
+        for child, h in zip(children, estimates):
+            if h == float("inf"):
+                continue
+            frontier.push((child.cost + h, h), child)
+        stats.add_time("frontier", clock() - frontier_time)
+        stats.add_time("heuristic", frontier_time - heuristic_time)
+        stats.add_time("expansion", heuristic_time - start_time)
+        stats.on_expand(len(frontier), len(closed))
+
+    raise ValueError("No valid path found in contracted A*.")
+
+def nearest_dirt_tour(oracle: DistanceOracle | HierarchicalMap) -> list[str] | None:
+    """
+    Greedily walk to the nearest remaining dirty cell until none are left.
+    Quick, but not optimal. Returns None if some dirty cell can't be reached.
+    """
+    move_seq = list()
+    pos = oracle.start
+    remaining = set(oracle.dirt_cells)
+    while remaining:
+        nearest = min(sorted(remaining), key=lambda cell: oracle.distance(pos, cell))
+        if oracle.distance(pos, nearest) == float("inf"):
+            return None
+        move_seq += oracle.get_path(pos, nearest)
+        move_seq.append("V")
+        remaining.remove(nearest)
+        pos = nearest
+    return move_seq
+
+def anytime_astar(world: WorldModel,
+                  heuristic: str | type[Heuristic] = "mst",
+                  weight: float = 2.0,
+                  time_budget: float | None = None,
+                  node_budget: int | None = None,
+                  pool: NodePool | None = None,
+                  stats: SearchStats | None = None,
+                  distances: str = "exact") -> tuple[int, int, list[str], bool]:
+    """
+    Anytime weighted A*: start from a greedy nearest-dirt plan, then keep improving it with
+    A* ordered by g + weight * h, pruning every state that can't beat the best plan so far.
+    Once nothing is left to expand, the best plan is proven optimal. If the time (seconds) or
+    node budget runs out first, the best plan so far is returned instead.
+
+    Returns the node counters, the moves of the best plan, and whether it is proven optimal.
+    """
+    if isinstance(heuristic, str):
+        if heuristic not in heuristics:
+            raise ValueError(f"Unknown heuristic: {heuristic}. Supported heuristics: {', '.join(heuristics)}.")
+        heuristic = heuristics[heuristic]
+
+    stats = stats if stats is not None else SearchStats()
+    clock = stats.clock
+    deadline = perf_counter() + time_budget if time_budget is not None else float("inf")
+    max_expanded = stats.nodes_expanded + node_budget if node_budget is not None else float("inf")
+
+    start, dirt_index = get_start_state(world, pool)
+    oracle = get_distance_provider(world, distances)
+    estimate = heuristic(sorted(dirt_index, key=dirt_index.get), oracle.distance)
+    h = estimate(start)
+    if h == float("inf"):
+        raise ValueError("No valid path found in anytime A*.")
+
+    best_seq = nearest_dirt_tour(oracle)
+    best_cost = len(best_seq) if best_seq is not None else float("inf")
+    stats.bound = best_cost if best_seq is not None else None
+    tie_breaker = count()
+    pq: list[tuple[float, int, int, SearchState]] = [(start.cost + weight * h, h, next(tie_breaker), start)]
+    # (pos, dirt mask) -> cheapest cost it has been reached with; a cheaper path reopens it,
+    # since the weighted ordering can expand a state before its best path is found
+    best_costs: dict[tuple[tuple[int, int], int], int] = {start.key: 0}
 
     while pq:
-        agent = hq.heappop(pq)
-
-        # if the agent has found a path to clean all dirty cells, return it
-        if not agent.world.dirty_cells:
-            return nodes_expanded, nodes_generated, agent
-
-        # if the agent is on a dirty cell, clean it
-        if agent.world.is_dirty(agent.pos):
-            agent.execute_action(Action("V", agent.tree_node))
-            hq.heappush(pq, deepcopy(agent))
-        
-        # if the agent has available actions, expand them
-        else:
-            agent.expand_children()
-            if not agent.tree_node.available_acts:
-                agent.backtrack()
-                hq.heappush(pq, deepcopy(agent))
-            else:
-                nodes_expanded += 1
-                nodes_generated += len(agent.tree_node.available_acts)
-                # for each available action, create a new agent and push it to the priority queue
-                #    using the length of the path as the cost
-                for action in agent.tree_node.available_acts:
-                    new_agent = deepcopy(agent)
-                    new_agent.execute_action(action)
-                    hq.heappush(pq, new_agent)
-
-    raise ValueError("No valid path found in UCS.")
\ No newline at end of file
+        start_time = clock()
+        _, h, _, state = hq.heappop(pq)
+        stats.add_time("frontier", clock() - start_time)
+        # skip states reached more cheaply since they were queued
+        if state.cost > best_costs[state.key]:
+            stats.duplicates += 1
+            continue
+        # and states that can no longer beat a plan found since they were queued
+        if state.cost + h >= best_cost:
+            continue
+
+        if stats.nodes_expanded >= max_expanded or perf_counter() >= deadline:
+            if best_seq is None:
+                raise TimeoutError("No plan found in anytime A* within the budget.")
+            return stats.nodes_expanded, stats.nodes_generated, best_seq, False
+
+        start_time = clock()
+        children = expand_state(world, state, dirt_index, pool, stats=stats)
+        heuristic_time = clock()
+        num_children = len(children)
+        children = [child for child in children if child.cost < best_costs.get(child.key, float("inf"))]
+        stats.duplicates += num_children - len(children)
+        estimates = [estimate(child) for child in children]
+        frontier_time = clock()
+        for child, h in zip(children, estimates):
+            if child.cost + h >= best_cost:
+                continue
+            best_costs[child.key] = child.cost
+            # with an admissible heuristic, h is 0 exactly at the goal, so this is a better plan
+            if not child.dirt_mask:
+                best_seq, best_cost = child.get_move_seq(), child.cost
+                stats.bound = best_cost
+                continue
+            hq.heappush(pq, (child.cost + weight * h, h, next(tie_breaker), child))
+        stats.add_time("frontier", clock() - frontier_time)
+        stats.add_time("heuristic", frontier_time - heuristic_time)
+        stats.add_time("expansion", heuristic_time - start_time)
+        stats.on_expand(len(pq), len(best_costs))
+
+    if best_seq is None:
+        raise ValueError("No valid path found in anytime A*.")
+    # hierarchical distances can overestimate, so running out of states proves nothing
+    return stats.nodes_expanded, stats.nodes_generated, best_seq, distances == "exact"
+
+def ida_star(world: WorldModel,
+             heuristic: str | type[Heuristic] = "mst",
+             table_size: int | None = None,
+             stats: SearchStats | None = None,
+             distances: str = "exact") -> tuple[int, int, list[str]]:
+    """
+    IDA*: depth-first searches bounded by f = g + h, raising the bound to the smallest f that
+    went over it after each failed iteration. Only the current branch is kept, so memory is O(depth).
+
+    With a table_size, up to that many states are remembered in a transposition table, least
+    recently used first out. A state whose subtree failed stores the smallest h backed up from its
+    children, which is still admissible but tighter, so later iterations prune it sooner. Reaching it
+    again in the same iteration with no smaller g is skipped, since its subtree already failed.
+    """
+    if isinstance(heuristic, str):
+        if heuristic not in heuristics:
+            raise ValueError(f"Unknown heuristic: {heuristic}. Supported heuristics: {', '.join(heuristics)}.")
+        heuristic = heuristics[heuristic]
+
+    stats = stats if stats is not None else SearchStats()
+    clock = stats.clock
+
+    start, dirt_index = get_start_state(world)
+    oracle = get_distance_provider(world, distances)
+    estimate = heuristic(sorted(dirt_index, key=dirt_index.get), oracle.distance)
+    # (pos, dirt mask) -> (learned h, g its subtree failed at, bound it failed under)
+    table: OrderedDict[tuple[tuple[int, int], int], tuple[float, int, float]] = OrderedDict()
+
+    def get_h(state: SearchState) -> float:
+        start_time = clock()
+        h = estimate(state)
+        entry = table.get(state.key)
+        if entry is not None:
+            table.move_to_end(state.key)
+            h = max(h, entry[0])
+        stats.add_time("heuristic", clock() - start_time)
+        return h
+
+    bound = get_h(start)
+    if not start.dirt_mask:
+        return stats.nodes_expanded, stats.nodes_generated, []
+
+    while bound < float("inf"):
+        stats.bound = bound
+        next_bound = float("inf")
+        # each frame is [state, iterator over its children, smallest 1 + h over the children so far]
+        stack = [[start, iter(expand_state(world, start, dirt_index, stats=stats)), float("inf")]]
+        on_branch = {start.key}
+        stats.on_expand(len(stack), len(table))
+
+        while stack:
+            frame = stack[-1]
+            child = next(frame[1], None)
+            # backtrack once every child has been tried, remembering how far from the goal the state proved to be
+            if child is None:
+                state, _, backed_up = stack.pop()
+                on_branch.discard(state.key)
+                learned = max(get_h(state), backed_up)
+                if table_size:
+                    table[state.key] = (learned, state.cost, bound)
+                    table.move_to_end(state.key)
+                    if len(table) > table_size:
+                        table.popitem(last=False)
+                if stack:
+                    stack[-1][2] = min(stack[-1][2], 1 + learned)
+                continue
+
+            h = get_h(child)
+            if child.cost + h > bound:
+                next_bound = min(next_bound, child.cost + h)
+                frame[2] = min(frame[2], 1 + h)
+                continue
+            entry = table.get(child.key)
+            # skip cycles back onto the branch, and states whose subtree already failed this iteration
+            if child.key in on_branch or (entry is not None and entry[2] == bound and entry[1] <= child.cost):
+                stats.duplicates += 1
+                frame[2] = min(frame[2], 1 + h)
+                continue
+
+            if not child.dirt_mask:
+                return stats.nodes_expanded, stats.nodes_generated, child.get_move_seq()
+
+            start_time = clock()
+            stack.append([child, iter(expand_state(world, child, dirt_index, stats=stats)), float("inf")])
+            on_branch.add(child.key)
+            stats.add_time("expansion", clock() - start_time)
+            stats.on_expand(len(stack), len(table))
+
+        bound = next_bound
+
+    raise ValueError("No valid path found in IDA*.")
+
+def get_visit_order(matrix: np.ndarray, stats: SearchStats | None = None) -> list[int]:
+    """
+    Solve the order to visit the dirty cells in as a shortest Hamiltonian path from the start,
+    with a bitmask DP over a distance matrix whose row and column 0 are the start.
+    Returns the dirty cells' indices (counting from 0) in visiting order.
+    Runs in O(2^k * k^2) time and O(2^k * k) memory for k dirty cells.
+    """
+    stats = stats if stats is not None else SearchStats()
+    num_dirty = len(matrix) - 1
+    dirt_dist = matrix[1:, 1:]
+    dirt_ids = np.arange(num_dirty)
+    bits = 1 << dirt_ids
+    # cost[mask, j]: shortest walk from the start through the dirty cells in mask, ending at cell j
+    cost = np.full((1 << num_dirty, num_dirty), np.inf)
+    # prev[mask, j]: the cell visited just before j on that walk
+    prev = np.full((1 << num_dirty, num_dirty), -1, dtype=np.int8)
+    cost[bits, dirt_ids] = matrix[0, 1:]
+    stats.nodes_generated += num_dirty
+
+    # every subset is built from smaller ones, so increasing order is a valid DP order
+    for mask in range(1, (1 << num_dirty) - 1):
+        visited = bin(mask).count("1")
+        stats.nodes_expanded += visited
+        stats.nodes_generated += visited * (num_dirty - visited)
+        # no single expansions here for on_expand to count, so report progress directly
+        stats.check_progress()
+
+        # legs[i, j]: cost of ending at i, then walking on to j
+        legs = cost[mask][:, None] + dirt_dist
+        best_prev = legs.argmin(axis=0)
+        unvisited = dirt_ids[(mask & bits) == 0]
+        # (mask | j, j) is only ever reached from mask, so it can be written directly
+        cost[mask | bits[unvisited], unvisited] = legs[best_prev[unvisited], unvisited]
+        prev[mask | bits[unvisited], unvisited] = best_prev[unvisited]
+
+    # walk the DP backwards from the cheapest end point to recover the visiting order
+    mask = (1 << num_dirty) - 1
+    last = int(cost[mask].argmin())
+    order = list()
+    while last != -1:
+        order.append(last)
+        mask, last = mask & ~(1 << last), int(prev[mask, last])
+    order.reverse()
+    return order
+
+def held_karp_legs(world: WorldModel,
+                   stats: SearchStats | None = None,
+                   distances: str = "exact") -> Iterator[list[str]]:
+    """
+    Find the best order to visit the dirty cells in over the provider's distance matrix,
+    then yield each leg's moves, ending with its vacuum, as soon as the leg is expanded.
+    """
+    stats = stats if stats is not None else SearchStats()
+    clock = stats.clock
+
+    oracle = get_distance_provider(world, distances)
+    if not oracle.dirt_cells:
+        return
+    matrix = np.array(oracle.matrix, dtype=float)
+    if np.isinf(matrix[0]).any():
+        raise ValueError("No valid path found in Held-Karp.")
+
+    start_time = clock()
+    order = get_visit_order(matrix, stats)
+    stats.add_time("dp", clock() - start_time)
+
+    pos = oracle.start
+    for i in order:
+        start_time = clock()
+        leg = oracle.get_path(pos, oracle.dirt_cells[i]) + ["V"]
+        stats.add_time("expansion", clock() - start_time)
+        yield leg
+        pos = oracle.dirt_cells[i]
+
+def held_karp(world: WorldModel,
+              stats: SearchStats | None = None,
+              distances: str = "exact") -> tuple[int, int, list[str]]:
+    """
+    Find the best order to visit the dirty cells in, then expand each leg into moves.
+    """
+    stats = stats if stats is not None else SearchStats()
+    move_seq = [move for leg in held_karp_legs(world, stats, distances) for move in leg]
+    return stats.nodes_expanded, stats.nodes_generated, move_seq
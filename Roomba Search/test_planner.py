@@ -0,0 +1,148 @@
+import os
+import asyncio
+from planner import plan, plan_batch, find_world_files
+from plan_server import PlanServer
+from plan_client import request_plan, parse_address
+from benchmark import run_benchmark, save_results, load_results, compare_results
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_world(tmp_path, name: str, rows: list[str]) -> str:
+    world_file = os.path.join(tmp_path, name)
+    with open(world_file, 'w', encoding='utf-16') as file:
+        file.write(f"{len(rows[0])}\n{len(rows)}\n" + "\n".join(rows))
+    return world_file
+
+
+class TestPlanner:
+    """Test suite for the planner's job records and batch mode."""
+
+    def test_plan_record(self):
+        """Test that a finished job reports its plan length and counters."""
+        record = plan(os.path.join(HERE, "random-5x7.txt"), "a-star")
+        assert record["status"] == "ok"
+        assert record["path_length"] == 10
+        assert record["nodes_expanded"] > 0
+        assert record["wall_time"] > 0
+        assert record["peak_rss_kb"] > 0
+
+    def test_plan_timeout(self, tmp_path):
+        """Test that a job over its time budget is reported as timed out."""
+        rows = ["@" + "_" * 39] + ["_" * 40] * 38 + ["*" + "_" * 38 + "*"]
+        record = plan(write_world(tmp_path, "open.txt", rows), "iterative-deepening", timeout=0.2)
+        assert record["status"] == "timeout"
+        assert record["wall_time"] < 5
+
+    def test_plan_error(self, tmp_path):
+        """Test that a failing job is reported instead of raised."""
+        record = plan(write_world(tmp_path, "walled.txt", ["@#*"]), "uniform-cost")
+        assert record["status"] == "error"
+        assert "ValueError" in record["error"]
+
+    def test_batch_covers_every_pair(self):
+        """Test that a batch yields one record per (file, algorithm) pair."""
+        world_files = find_world_files(HERE)
+        assert len(world_files) == 3
+        records = list(plan_batch(world_files, ["uniform-cost", "held-karp"], timeout=30, workers=2))
+        assert {(r["world_file"], r["algorithm"]) for r in records}\
+            == {(f, a) for f in world_files for a in ["uniform-cost", "held-karp"]}
+        assert all(r["status"] == "ok" for r in records)
+
+
+class TestBenchmark:
+    """Test suite for the benchmark sweep and regression check."""
+
+    def test_run_and_compare(self, tmp_path):
+        """Test that a sweep round-trips through CSV and flags a slower, longer candidate."""
+        results = run_benchmark([8], [0.2], [2, 3], maps_per_config=2, timeout=30,
+                                bench_algorithms=["a-star", "held-karp"], workers=2)
+        assert len(results) == 8
+        assert all(row["status"] == "ok" and row["nodes_expanded_per_sec"] > 0 for row in results)
+
+        results_file = str(tmp_path / "results.csv")
+        save_results(results, results_file)
+        baseline = load_results(results_file)
+        assert compare_results(baseline, results) == []
+
+        candidate = [dict(row) for row in baseline]
+        candidate[0]["wall_time"] *= 100
+        candidate[1]["path_length"] += 1
+        candidate[2]["status"] = "timeout"
+        assert len(compare_results(baseline, candidate)) == 3
+
+
+class TestPlanServer:
+    """Test suite for the local planning service."""
+
+    def test_coalesces_and_caches(self, tmp_path):
+        """Test that identical concurrent requests share one load and one search, and repeats come from the cache."""
+        address = str(tmp_path / "planner.sock")
+        world_file = os.path.join(HERE, "random-20x5.txt")
+
+        async def run() -> tuple[list[dict], dict, PlanServer]:
+            plan_server = PlanServer(workers=2, cache_size=4)
+            try:
+                async with await plan_server.start(address):
+                    records = await asyncio.gather(
+                        *[request_plan(address, world_file, "a-star") for _ in range(5)],
+                        request_plan(address, world_file, "no-such-search")
+                    )
+                    repeat = await request_plan(address, world_file, "a-star")
+            finally:
+                plan_server.close()
+            return records, repeat, plan_server
+
+        records, repeat, plan_server = asyncio.run(run())
+        *records, unknown = records
+        assert all(record["status"] == "ok" and len(record["path"]) == 26 for record in records)
+        assert sorted((record["cached"], record["coalesced"]) for record in records) == \
+            [(False, False)] + [(False, True)] * 4
+        assert unknown["status"] == "error" and "Unknown algorithm" in unknown["error"]
+        assert repeat["cached"] and not repeat["coalesced"] and repeat["path"] == records[0]["path"]
+        assert (plan_server.loads, plan_server.searches, plan_server.coalesced, plan_server.cache_hits) == (1, 2, 4, 1)
+
+    def test_unchanged_files_are_not_reloaded(self, tmp_path):
+        """Test that a file is only parsed again once it changes, and then gets a fresh plan."""
+        address = str(tmp_path / "planner.sock")
+        world_file = write_world(tmp_path, "world.txt", ["@__*"])
+
+        async def run() -> tuple[list[dict], PlanServer]:
+            plan_server = PlanServer(workers=1)
+            try:
+                async with await plan_server.start(address):
+                    records = [await request_plan(address, world_file, "a-star") for _ in range(2)]
+                    write_world(tmp_path, "world.txt", ["@____*"])
+                    records.append(await request_plan(address, world_file, "a-star"))
+            finally:
+                plan_server.close()
+            return records, plan_server
+
+        records, plan_server = asyncio.run(run())
+        assert [len(record["path"]) for record in records] == [4, 4, 6]
+        assert [record["cached"] for record in records] == [False, True, False]
+        assert (plan_server.loads, plan_server.searches) == (2, 2)
+
+    def test_errors_are_reported(self, tmp_path):
+        """Test that failing requests get error records instead of breaking the connection."""
+        address = str(tmp_path / "planner.sock")
+
+        async def run() -> list[dict]:
+            plan_server = PlanServer(workers=1)
+            try:
+                async with await plan_server.start(address):
+                    return [
+                        await request_plan(address, str(tmp_path / "missing.txt"), "a-star"),
+                        await request_plan(address, os.path.join(HERE, "random-5x7.txt"), "no-such-search")
+                    ]
+            finally:
+                plan_server.close()
+
+        missing, unknown = asyncio.run(run())
+        assert missing["status"] == "error" and "FileNotFoundError" in missing["error"]
+        assert unknown["status"] == "error" and "Unknown algorithm" in unknown["error"]
+
+    def test_parse_address(self):
+        """Test that host:port means TCP and anything else is a socket path."""
+        assert parse_address("127.0.0.1:4800") == ("127.0.0.1", 4800)
+        assert parse_address("/tmp/planner.sock") is None
@@ -0,0 +1,850 @@
+import os
+import time
+import random
+import threading
+from itertools import count
+import pytest
+import numpy as np
+from World import World
+from Grid import Grid
+from make_vacuum_world import generate_grid, make_reachable
+from config import offset_map
+from DistanceOracle import DistanceOracle
+from HierarchicalMap import HierarchicalMap
+from CorridorGraph import CorridorGraph
+from wavefront import wavefront_bfs, distance_fields, UNREACHED
+from Agent import Agent
+from SearchStats import SearchStats
+from NodePool import NodePool
+from AgentPath import AgentPath
+from Frontier import HeapFrontier, BucketFrontier
+import searches
+from searches import ucs
+from IncrementalPlanner import IncrementalPlanner
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_MAPS = ["random-5x7.txt", "random-11x6.txt", "random-20x5.txt"]
+# optimal plan lengths for the sample maps
+OPTIMAL_LENGTHS = {"random-5x7.txt": 10, "random-11x6.txt": 24, "random-20x5.txt": 26}
+
+
+def load_world(name: str) -> World:
+    with open(os.path.join(HERE, name), 'r', encoding='utf-16') as file:
+        return World(file.read().strip())
+
+
+def make_random_world(seed: int, rows: int, cols: int, blocked_fraction: float, num_dirty: int) -> World:
+    """Build a random world whose dirt is all reachable from the robot."""
+    rng = np.random.default_rng(seed)
+    cells = generate_grid(rng, rows, cols, blocked_fraction, num_dirty)
+    make_reachable(rng, cells, "repair")
+    return World.from_grid(Grid(cells))
+
+
+def replay(world: World, moves: list[str]) -> set[tuple[int, int]]:
+    """Execute a plan on a world and return the dirty cells it leaves behind."""
+    pos = world.get_bot_pos_from_grid()
+    dirt = set(world.dirty_cells)
+    for move in moves:
+        if move == "V":
+            assert pos in dirt, f"Vacuumed a clean cell at {pos}"
+            dirt.remove(pos)
+        else:
+            diff = offset_map[move]
+            pos = (pos[0] + diff[0], pos[1] + diff[1])
+            assert world.is_open(pos), f"Moved into a blocked cell at {pos}"
+    return dirt
+
+
+class TestUniformCost:
+    """Test suite for the state-space uniform-cost search."""
+
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    def test_finds_optimal_plan(self, name):
+        """Test that UCS cleans every dirty cell with the fewest moves."""
+        world = load_world(name)
+        output = world.search("uniform-cost")
+        assert replay(world, output["path"]) == set()
+        assert len(output["path"]) == OPTIMAL_LENGTHS[name]
+        assert output["nodes_expanded"] <= output["nodes_generated"]
+
+    def test_leaves_world_untouched(self):
+        """Test that the search only reads the world."""
+        world = load_world("random-5x7.txt")
+        dirt_before = set(world.dirty_cells)
+        world.search("uniform-cost")
+        assert world.dirty_cells == dirt_before
+
+    def test_no_dirt(self):
+        """Test that a clean world needs no moves."""
+        world = World("3\n1\n@__")
+        assert world.search("uniform-cost")["path"] == []
+
+    def test_unreachable_dirt(self):
+        """Test that unreachable dirt raises an error."""
+        world = World("3\n1\n@#*")
+        with pytest.raises(ValueError):
+            world.search("uniform-cost")
+
+
+class TestIncrementalPlanner:
+    """Test suite for replanning after changes to the world."""
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_full_replan(self, seed):
+        """Test that repaired fields and plans match ones built from scratch after random changes."""
+        world = make_random_world(seed, 15, 20, 0.25, 4)
+        planner = IncrementalPlanner(world)
+        events = random.Random(seed)
+        for _ in range(40):
+            event = events.choice(["add-obstacle", "add-obstacle", "remove-obstacle", "add-dirt", "clean-dirt"])
+            pos = (events.randrange(15), events.randrange(20))
+            if event == "clean-dirt" and planner.fields:
+                pos = events.choice(sorted(planner.fields))
+            try:
+                planner.apply(event, pos)
+            except ValueError:
+                continue
+            for dirt, field in planner.fields.items():
+                assert field == planner.bfs(dirt)
+            fresh = World.from_grid(Grid(world.grid.cells.copy()))
+            try:
+                expected = len(fresh.search("held-karp")["path"])
+            except ValueError:
+                with pytest.raises(ValueError):
+                    planner.plan()
+                continue
+            move_seq = planner.plan()
+            assert replay(fresh, move_seq) == set()
+            assert len(move_seq) == expected
+
+    def test_detour_and_shortcut(self):
+        """Test that a blocked leg is rerouted, and that reopening it restores the short plan."""
+        world = World("5\n2\n@___*\n_____")
+        planner = IncrementalPlanner(world)
+        assert planner.plan() == ["E", "E", "E", "E", "V"]
+        planner.apply("add-obstacle", (0, 2))
+        assert len(planner.plan()) == 7
+        assert planner.cells_repaired > 0
+        planner.apply("remove-obstacle", (0, 2))
+        assert planner.plan() == ["E", "E", "E", "E", "V"]
+
+    def test_no_dirt_under_robot(self):
+        """Test that dirt can't be added where the robot is or where its '@' marks the start."""
+        world = World("5\n1\n*_@_*")
+        planner = IncrementalPlanner(world)
+        with pytest.raises(ValueError):
+            planner.apply("add-dirt", (0, 2))
+        planner.move_robot((0, 3))
+        with pytest.raises(ValueError):
+            planner.apply("add-dirt", (0, 3))
+        with pytest.raises(ValueError):
+            planner.apply("add-dirt", (0, 2))
+        assert world.get_bot_pos_from_grid() == (0, 2)
+        planner.apply("add-dirt", (0, 1))
+        assert world.dirty_cells == {(0, 0), (0, 1), (0, 4)}
+
+    def test_moving_robot_and_cleaning(self):
+        """Test that the plan starts from the robot's new position and skips cleaned dirt."""
+        world = World("5\n1\n*_@_*")
+        planner = IncrementalPlanner(world)
+        planner.move_robot((0, 3))
+        assert planner.plan() == ["E", "V", "W", "W", "W", "W", "V"]
+        planner.apply("clean-dirt", (0, 4))
+        assert not world.is_dirty((0, 4))
+        assert planner.plan() == ["W", "W", "W", "V"]
+
+    def test_invalid_events(self):
+        """Test that impossible or unknown changes raise errors."""
+        planner = IncrementalPlanner(World("3\n1\n@_*"))
+        with pytest.raises(ValueError):
+            planner.apply("add-obstacle", (0, 2))
+        with pytest.raises(ValueError):
+            planner.apply("remove-obstacle", (0, 1))
+        with pytest.raises(ValueError):
+            planner.apply("flood", (0, 1))
+
+
+class TestFrontier:
+    """Test suite for the frontier priority queues."""
+
+    @pytest.mark.parametrize("frontier_type", [HeapFrontier, BucketFrontier])
+    def test_orders_by_priority_then_fifo(self, frontier_type):
+        """Test that items come out by priority, and in push order within a priority."""
+        frontier = frontier_type()
+        for priority, item in [(2, "a"), (0, "b"), (1, "c"), (0, "d"), (2, "e")]:
+            frontier.push(priority, item)
+        assert len(frontier) == 5
+        assert [frontier.pop() for _ in range(3)] == ["b", "d", "c"]
+        frontier.push(1, "f")
+        assert [frontier.pop() for _ in range(3)] == ["f", "a", "e"]
+        assert not frontier
+
+    def test_bucket_pop_empty(self):
+        """Test that popping an empty bucket queue raises like an empty heap."""
+        with pytest.raises(IndexError):
+            BucketFrontier().pop()
+
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    def test_ucs_frontiers_agree(self, name):
+        """Test that UCS does the same work with either frontier."""
+        world = load_world(name)
+        assert ucs(world, frontier_type=HeapFrontier) == ucs(world, frontier_type=BucketFrontier)
+
+
+class TestAStar:
+    """Test suite for A* and its heuristics."""
+
+    @pytest.mark.parametrize("heuristic", ["zero", "farthest-dirt", "mst"])
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    def test_finds_optimal_plan(self, name, heuristic):
+        """Test that A* stays optimal with every admissible heuristic."""
+        world = load_world(name)
+        output = world.search("a-star", heuristic)
+        assert replay(world, output["path"]) == set()
+        assert len(output["path"]) == OPTIMAL_LENGTHS[name]
+
+    def test_zero_heuristic_matches_ucs(self):
+        """Test that the zero heuristic expands as many nodes as UCS."""
+        world = load_world("random-11x6.txt")
+        assert world.search("a-star", "zero")["nodes_expanded"]\
+            == world.search("uniform-cost")["nodes_expanded"]
+
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    def test_mst_expands_fewer_nodes(self, name):
+        """Test that the MST heuristic prunes the search compared to UCS."""
+        world = load_world(name)
+        assert world.search("a-star", "mst")["nodes_expanded"]\
+            < world.search("uniform-cost")["nodes_expanded"]
+
+    def test_unknown_heuristic(self):
+        """Test that an unknown heuristic name is rejected."""
+        with pytest.raises(ValueError):
+            load_world("random-5x7.txt").search("a-star", "euclidean")
+
+
+class TestCorridorGraph:
+    """Test suite for corridor contraction and A* over the contracted graph."""
+
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    def test_contracted_astar_is_optimal(self, name):
+        """Test that A* over the corridor graph finds plans as short as A* over the cells."""
+        world = load_world(name)
+        output = world.search("contracted-a-star")
+        assert replay(world, output["path"]) == set()
+        assert len(output["path"]) == OPTIMAL_LENGTHS[name]
+        assert output["optimal"]
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_astar_on_random_maps(self, seed):
+        """Test that contracted plans are valid and as short as A*'s on random maps."""
+        world = make_random_world(seed, 15, 20, 0.35, 4)
+        output = world.search("contracted-a-star")
+        assert replay(world, output["path"]) == set()
+        assert len(output["path"]) == len(world.search("a-star")["path"])
+
+    def test_corridors_become_edges(self):
+        """Test that a winding corridor collapses to one edge whose moves walk it."""
+        world = World("7\n3\n@______\n######_\n*______")
+        graph = CorridorGraph(world)
+        assert graph.nodes == {(0, 0), (2, 0)}
+        length, moves = graph.get_edges((0, 0))[(2, 0)]
+        assert (length, moves) == (14, "EEEEEESSWWWWWW")
+
+    def test_dead_ends_are_pruned(self):
+        """Test that branches leading only to clean dead ends are dropped from the graph."""
+        world = World("5\n3\n@___*\n_#_#_\n_#_#_")
+        graph = CorridorGraph(world)
+        assert graph.nodes == {(0, 0), (0, 2), (0, 4)}
+        assert set(graph.get_edges((0, 2))) == {(0, 0), (0, 4)}
+        assert world.search("contracted-a-star")["path"] == list("EEEEV")
+
+
+class TestWavefront:
+    """Test suite for the NumPy wavefront BFS kernel."""
+
+    @staticmethod
+    def make_world(seed: int) -> World:
+        return make_random_world(seed, 30, 40, 0.3, 5)
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_fields_match_bfs(self, seed):
+        """Test that each source's field matches a BFS from it, with walled-off cells unreached."""
+        world = self.make_world(seed)
+        sources = [world.get_bot_pos_from_grid()] + sorted(world.dirty_cells)
+        fields = distance_fields(world.obstacle_mask, sources)
+        for source, field in zip(sources, fields):
+            expected = np.full(field.shape, UNREACHED)
+            for pos, distance in DistanceOracle.bfs(world, source)[0].items():
+                expected[pos] = distance
+            assert (field == expected).all()
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_nearest_source_and_labels(self, seed):
+        """Test that multi-source distances are the minimum over the fields, and labels name a nearest source."""
+        world = self.make_world(seed)
+        sources = [world.get_bot_pos_from_grid()] + sorted(world.dirty_cells)
+        fields = distance_fields(world.obstacle_mask, sources)
+        distances, labels = wavefront_bfs(world.obstacle_mask, sources, return_labels=True)
+        reached = (fields != UNREACHED).any(axis=0)
+        assert ((distances != UNREACHED) == reached).all()
+        assert ((labels != UNREACHED) == reached).all()
+        nearest = np.where(fields == UNREACHED, np.iinfo(np.int32).max, fields).min(axis=0)
+        assert (distances[reached] == nearest[reached]).all()
+        labeled = np.take_along_axis(fields, np.maximum(labels, 0)[None], axis=0)[0]
+        assert (labeled[reached] == distances[reached]).all()
+
+    def test_blocked_source(self):
+        """Test that a source on an obstacle is rejected."""
+        with pytest.raises(ValueError):
+            wavefront_bfs(np.array([[False, True]]), [(0, 1)])
+
+
+class TestDistanceOracle:
+    """Test suite for the start/dirt distance oracle."""
+
+    def test_pairwise_distances(self):
+        """Test distances around an obstacle."""
+        world = World("3\n2\n@#*\n___")
+        oracle = DistanceOracle(world)
+        assert oracle.sources == [(0, 0), (0, 2)]
+        assert oracle.matrix == [[0, 4], [4, 0]]
+        assert oracle.distance((1, 1), (0, 2)) == 2
+
+    def test_paths_follow_shortest_routes(self):
+        """Test that expanded paths are legal and as long as the distance."""
+        world = load_world("random-11x6.txt")
+        oracle = DistanceOracle(world)
+        for pos in oracle.dirt_cells:
+            moves = oracle.get_path(oracle.start, pos)
+            assert len(moves) == oracle.distance(oracle.start, pos)
+            assert replay(world, moves + ["V"]) == world.dirty_cells - {pos}
+            assert len(oracle.get_path(pos, oracle.start)) == len(moves)
+
+    def test_unreachable_cells(self):
+        """Test that walled-off dirt is infinitely far away."""
+        oracle = DistanceOracle(World("3\n1\n@#*"))
+        assert oracle.distance((0, 0), (0, 2)) == float("inf")
+        with pytest.raises(ValueError):
+            oracle.get_path((0, 0), (0, 2))
+
+    def test_cached_per_map(self):
+        """Test that the same map reuses its oracle, and a changed map doesn't."""
+        world = load_world("random-5x7.txt")
+        oracle = DistanceOracle.for_world(world)
+        assert DistanceOracle.for_world(load_world("random-5x7.txt")) is oracle
+        world.remove_dirty_cell(sorted(world.dirty_cells)[0])
+        assert DistanceOracle.for_world(world) is not oracle
+
+
+class TestHierarchicalMap:
+    """Test suite for the cluster hierarchy distance provider."""
+
+    @staticmethod
+    def make_world(seed: int) -> World:
+        return make_random_world(seed, 40, 50, 0.25, 5)
+
+    @pytest.mark.parametrize("seed", [0, 1])
+    def test_paths_are_real_and_near_shortest(self, seed):
+        """Test that every path is walkable, as long as its distance, and close to the shortest."""
+        world = self.make_world(seed)
+        hierarchy = HierarchicalMap(world, cluster_size=8)
+        oracle = DistanceOracle(world)
+        open_cells = list(zip(*np.nonzero(~world.obstacle_mask)))
+        for i in range(0, len(open_cells), 97):
+            cell = tuple(int(x) for x in open_cells[i])
+            for source in oracle.sources:
+                exact = oracle.distance(cell, source)
+                if exact == float("inf"):
+                    assert hierarchy.distance(cell, source) == float("inf")
+                    continue
+                assert exact <= hierarchy.distance(cell, source) <= 1.5 * exact + 2
+                moves = hierarchy.get_path(cell, source)
+                assert len(moves) == hierarchy.distance(cell, source)
+                pos = cell
+                for move in moves:
+                    pos = (pos[0] + offset_map[move][0], pos[1] + offset_map[move][1])
+                    assert world.is_open(pos)
+                assert pos == source
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_pairs_through_entrances(self, seed):
+        """Test that paths between cells that aren't sources are real, even when they start or end on an entrance."""
+        world = make_random_world(seed, 20, 30, 0.25, 3)
+        hierarchy = HierarchicalMap(world, cluster_size=4)
+        entrances = sorted(node for node in hierarchy.edges if node not in hierarchy.source_fields)
+        open_cells = [tuple(int(x) for x in cell) for cell in zip(*np.nonzero(~world.obstacle_mask))]
+        cells = [cell for cell in open_cells if cell not in hierarchy.source_fields]
+        pairs = random.Random(seed)
+        for _ in range(60):
+            pos1 = pairs.choice(entrances)
+            pos2 = pairs.choice(entrances if pairs.random() < 0.5 else cells)
+            if pairs.random() < 0.5:
+                pos1, pos2 = pos2, pos1
+            exact = int(wavefront_bfs(world.obstacle_mask, [pos1])[pos2])
+            if exact == UNREACHED:
+                assert hierarchy.distance(pos1, pos2) == float("inf")
+                continue
+            assert exact <= hierarchy.distance(pos1, pos2) <= 1.5 * exact + 2
+            moves = hierarchy.get_path(pos1, pos2)
+            assert len(moves) == hierarchy.distance(pos1, pos2)
+            pos = pos1
+            for move in moves:
+                pos = (pos[0] + offset_map[move][0], pos[1] + offset_map[move][1])
+                assert world.is_open(pos)
+            assert pos == pos2
+
+    def test_same_cluster_shortcut(self):
+        """Test that two cells of one cluster are joined directly, not through an entrance."""
+        world = World("4\n1\n@__*")
+        hierarchy = HierarchicalMap(world, cluster_size=8)
+        assert hierarchy.distance((0, 0), (0, 3)) == 3
+        assert hierarchy.get_path((0, 1), (0, 2)) == ["E"]
+
+    @pytest.mark.parametrize("algorithm", ["a-star", "anytime-a-star", "held-karp"])
+    def test_search_provider(self, algorithm):
+        """Test that the engines plan with hierarchical distances, without claiming optimality."""
+        world = self.make_world(2)
+        output = world.search(algorithm, distances="hierarchical")
+        assert replay(world, output["path"]) == set()
+        assert not output["optimal"]
+
+    def test_unknown_provider(self):
+        """Test that an unknown distance provider raises an error."""
+        with pytest.raises(ValueError):
+            load_world("random-5x7.txt").search("held-karp", distances="euclidean")
+
+
+class TestIDAStar:
+    """Test suite for the memory-bounded IDA* mode."""
+
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    @pytest.mark.parametrize("table_size", [None, 50, 100000])
+    def test_finds_optimal_plan(self, name, table_size):
+        """Test that IDA* returns a shortest plan, with or without a transposition table."""
+        world = load_world(name)
+        output = world.search("ida-star", table_size=table_size)
+        assert replay(world, output["path"]) == set()
+        assert len(output["path"]) == OPTIMAL_LENGTHS[name]
+
+    def test_table_cuts_reexpansions(self):
+        """Test that the transposition table saves work, and never grows past its cap."""
+        world = load_world("random-20x5.txt")
+        plain = SearchStats()
+        world.search("ida-star", heuristic="farthest-dirt", stats=plain)
+        bounded = SearchStats()
+        world.search("ida-star", heuristic="farthest-dirt", table_size=100, stats=bounded)
+        assert bounded.nodes_expanded < plain.nodes_expanded
+        assert bounded.closed_size <= 100
+
+    def test_unreachable_dirt(self):
+        """Test that unreachable dirt raises an error."""
+        with pytest.raises(ValueError):
+            World("3\n1\n@#*").search("ida-star")
+
+
+class TestHeldKarp:
+    """Test suite for the Held-Karp visiting-order solver."""
+
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    def test_finds_optimal_plan(self, name):
+        """Test that the expanded legs form an optimal, legal plan."""
+        world = load_world(name)
+        output = world.search("held-karp")
+        assert replay(world, output["path"]) == set()
+        assert len(output["path"]) == OPTIMAL_LENGTHS[name]
+
+    def test_matches_astar_with_more_dirt(self):
+        """Test Held-Karp against A* on an open map with many dirty cells."""
+        world = World("8\n4\n*__*___*\n_#_*_#*_\n@__#__*_\n*__*____")
+        assert len(world.search("held-karp")["path"]) == len(world.search("a-star")["path"])
+
+    def test_unreachable_dirt(self):
+        """Test that unreachable dirt raises an error."""
+        with pytest.raises(ValueError):
+            World("3\n1\n@#*").search("held-karp")
+
+
+class TestDepthFirst:
+    """Test suite for the iterative DFS engine."""
+
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    def test_finds_valid_plan(self, name):
+        """Test that DFS cleans every dirty cell."""
+        world = load_world(name)
+        output = world.search("depth-first")
+        assert replay(world, output["path"]) == set()
+        assert output["nodes_expanded"] <= output["nodes_generated"]
+
+    def test_large_open_grid(self):
+        """Test that long branches don't hit the recursion limit."""
+        rows = ["@" + "_" * 59] + ["_" * 60] * 58 + ["_" * 59 + "*"]
+        world = World("60\n60\n" + "\n".join(rows))
+        assert replay(world, world.search("depth-first")["path"]) == set()
+
+    def test_depth_limit(self):
+        """Test that a depth limit bounds the plan length, and fails when too small."""
+        world = load_world("random-20x5.txt")
+        assert len(world.search("depth-first", depth_limit=30)["path"]) <= 30
+        with pytest.raises(ValueError):
+            world.search("depth-first", depth_limit=25)
+
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    def test_iterative_deepening_is_optimal(self, name):
+        """Test that iterative deepening returns a shortest plan."""
+        world = load_world(name)
+        output = world.search("iterative-deepening")
+        assert replay(world, output["path"]) == set()
+        assert len(output["path"]) == OPTIMAL_LENGTHS[name]
+
+    def test_unreachable_dirt(self):
+        """Test that both modes give up on unreachable dirt."""
+        world = World("3\n1\n@#*")
+        with pytest.raises(ValueError):
+            world.search("depth-first")
+        with pytest.raises(ValueError):
+            world.search("iterative-deepening")
+
+
+class TestAnytimeAStar:
+    """Test suite for the budgeted anytime weighted A* mode."""
+
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    def test_unbounded_is_optimal(self, name):
+        """Test that without a budget the plan is shortest and proven optimal."""
+        world = load_world(name)
+        output = world.search("anytime-a-star")
+        assert replay(world, output["path"]) == set()
+        assert len(output["path"]) == OPTIMAL_LENGTHS[name]
+        assert output["optimal"]
+
+    def test_node_budget_returns_incumbent(self):
+        """Test that an exhausted budget still returns a valid plan, flagged as unproven."""
+        world = load_world("random-11x6.txt")
+        output = world.search("anytime-a-star", node_budget=0)
+        assert replay(world, output["path"]) == set()
+        assert len(output["path"]) >= OPTIMAL_LENGTHS["random-11x6.txt"]
+        assert not output["optimal"]
+        assert output["nodes_expanded"] == 0
+
+    def test_time_budget(self):
+        """Test that a time budget stops a search that would otherwise run much longer."""
+        world = make_random_world(0, 40, 40, 0.2, 25)
+        start = time.perf_counter()
+        output = world.search("anytime-a-star", time_budget=0.1)
+        assert time.perf_counter() - start < 1
+        assert replay(world, output["path"]) == set()
+        assert not output["optimal"]
+
+    def test_budget_needs_anytime_mode(self):
+        """Test that other modes reject a budget instead of ignoring it."""
+        with pytest.raises(ValueError):
+            load_world("random-5x7.txt").search("uniform-cost", node_budget=10)
+
+    def test_unreachable_dirt(self):
+        """Test that unreachable dirt raises an error."""
+        with pytest.raises(ValueError):
+            World("3\n1\n@#*").search("anytime-a-star")
+
+
+class TestNodePool:
+    """Test suite for reusing search states across searches."""
+
+    @pytest.mark.parametrize("algorithm", ["depth-first", "iterative-deepening", "uniform-cost", "a-star", "anytime-a-star"])
+    def test_consecutive_searches_match(self, algorithm):
+        """Test that searches sharing one pool find the same plans as searches with fresh states."""
+        pool = NodePool()
+        for name in SAMPLE_MAPS + SAMPLE_MAPS:
+            world = load_world(name)
+            assert world.search(algorithm, pool=pool)["path"] == world.search(algorithm)["path"]
+
+    def test_pool_is_capped(self):
+        """Test that the pool keeps at most max_states states, and reset drops their parents."""
+        pool = NodePool(max_states=50)
+        world = load_world("random-11x6.txt")
+        output = world.search("uniform-cost", pool=pool)
+        assert len(pool.states) == 50 and len(pool) == output["nodes_generated"] + 1
+        assert world.search("uniform-cost", pool=pool)["path"] == output["path"]
+        pool.reset()
+        assert len(pool) == 0 and all(state.parent is None for state in pool.states)
+
+
+class TestSearchStats:
+    """Test suite for the stats shared by every search engine."""
+
+    @pytest.mark.parametrize("algorithm", ["depth-first", "iterative-deepening", "uniform-cost", "a-star", "anytime-a-star", "ida-star", "held-karp"])
+    def test_counters_match_output(self, algorithm):
+        """Test that the stats summary agrees with the returned node counters."""
+        output = load_world("random-5x7.txt").search(algorithm)
+        assert output["stats"]["nodes_expanded"] == output["nodes_expanded"]
+        assert output["stats"]["nodes_generated"] == output["nodes_generated"]
+
+    def test_frontier_and_duplicates(self):
+        """Test that UCS records its frontier, closed set and duplicate hits."""
+        stats = SearchStats()
+        load_world("random-11x6.txt").search("uniform-cost", stats=stats)
+        assert stats.max_frontier >= stats.frontier_size > 0
+        assert stats.closed_size == stats.nodes_expanded
+        assert 0 < stats.get_duplicate_rate() < 1
+
+    def test_phase_times(self):
+        """Test that phases are only timed when asked to be."""
+        world = load_world("random-5x7.txt")
+        timed = SearchStats(timed=True)
+        world.search("a-star", stats=timed)
+        assert {"expansion", "legality", "copying", "frontier", "heuristic"} <= timed.phase_times.keys()
+        assert all(seconds >= 0 for seconds in timed.phase_times.values())
+        untimed = SearchStats()
+        world.search("a-star", stats=untimed)
+        assert all(seconds == 0 for seconds in untimed.phase_times.values())
+
+    def test_callback_samples_progress(self):
+        """Test that the callback is called every sample_every expansions."""
+        calls = []
+        stats = SearchStats(callback=lambda stats: calls.append(stats.nodes_expanded), sample_every=10)
+        load_world("random-11x6.txt").search("uniform-cost", stats=stats)
+        assert calls == list(range(10, stats.nodes_expanded + 1, 10))
+        assert [sample[0] for sample in stats.frontier_samples] == calls
+
+
+class TestPruning:
+    """Test suite for the vacuum-state pruning rules."""
+
+    ALL_RULES = ("vacuum-on-pass", "dominance", "commuting-moves")
+
+    @pytest.mark.parametrize("algorithm", ["uniform-cost", "a-star"])
+    @pytest.mark.parametrize("name", SAMPLE_MAPS)
+    def test_plans_stay_optimal(self, name, algorithm):
+        """Test that each rule, and all of them together, keep plans valid and optimal while generating fewer nodes."""
+        world = load_world(name)
+        baseline = world.search(algorithm)
+        for pruning in [(rule,) for rule in self.ALL_RULES] + [self.ALL_RULES]:
+            output = world.search(algorithm, pruning=pruning)
+            assert replay(world, output["path"]) == set()
+            assert len(output["path"]) == OPTIMAL_LENGTHS[name]
+            assert output["nodes_generated"] <= baseline["nodes_generated"]
+        assert output["nodes_generated"] < baseline["nodes_generated"]
+        assert sum(output["stats"]["pruned"].values()) > 0
+
+    @pytest.mark.parametrize("seed", range(10))
+    def test_random_maps(self, seed):
+        """Test that all rules together keep UCS optimal on random maps."""
+        world = make_random_world(seed, 8, 9, 0.25, 5)
+        output = world.search("uniform-cost", pruning=self.ALL_RULES)
+        assert replay(world, output["path"]) == set()
+        assert len(output["path"]) == len(world.search("held-karp")["path"])
+
+    def test_vacuum_on_pass(self):
+        """Test that standing on dirt only generates the vacuum."""
+        world = World("3\n1\n*@*")
+        stats = SearchStats()
+        world.search("uniform-cost", stats=stats, pruning=("vacuum-on-pass",))
+        assert stats.pruned["vacuum-on-pass"] > 0
+
+    def test_dominance_counted(self):
+        """Test that dominated states are counted when dirt can't be passed over."""
+        output = load_world("random-11x6.txt").search("uniform-cost", pruning=("vacuum-on-pass", "dominance"))
+        assert output["stats"]["pruned"]["dominance"] > 0
+
+    @pytest.mark.parametrize("algorithm", ["uniform-cost", "a-star"])
+    def test_unreachable_dirt(self, algorithm):
+        """Test that unreachable dirt still raises the search's error, even from a cell with no moves."""
+        with pytest.raises(ValueError):
+            World("3\n1\n@#*").search(algorithm, pruning=self.ALL_RULES)
+        with pytest.raises(ValueError):
+            World("3\n1\n@#*").search(algorithm, pruning=("vacuum-on-pass",))
+
+    def test_unsupported(self):
+        """Test that unknown rules and algorithms without pruning are rejected."""
+        world = load_world("random-5x7.txt")
+        with pytest.raises(ValueError):
+            world.search("uniform-cost", pruning=("no-such-rule",))
+        with pytest.raises(ValueError):
+            world.search("ida-star", pruning=("dominance",))
+
+
+class TestSearchStream:
+    """Test suite for streaming plans and progress out of a running search."""
+
+    @pytest.mark.parametrize("algorithm", ["uniform-cost", "a-star", "held-karp"])
+    def test_legs_make_up_the_plan(self, algorithm):
+        """Test that the streamed legs each end with a vacuum and add up to the returned plan."""
+        world = load_world("random-11x6.txt")
+        events = list(world.search_stream(algorithm))
+        legs = [event["moves"] for event in events if event["event"] == "leg"]
+        assert events[-1]["event"] == "done"
+        assert all(leg[-1] == "V" for leg in legs)
+        assert [move for leg in legs for move in leg] == events[-1]["path"]
+        assert len(events[-1]["path"]) == OPTIMAL_LENGTHS["random-11x6.txt"]
+
+    def test_held_karp_legs_come_before_done(self, monkeypatch):
+        """Test that held-karp hands out its first leg before it expands the second one."""
+        world = load_world("random-20x5.txt")
+        oracle = searches.get_distance_provider(world, "exact")
+        get_path = oracle.get_path
+        calls = count()
+        release = threading.Event()
+
+        def get_blocking_path(*args):
+            # the search stalls before the second leg until the first one has been received
+            if next(calls) == 1:
+                assert release.wait(timeout=10), "The first leg was held back until the plan was done."
+            return get_path(*args)
+
+        monkeypatch.setattr(oracle, "get_path", get_blocking_path)
+        stream = world.search_stream("held-karp")
+        first = next(stream)
+        assert first["event"] == "leg" and first["robot"] == 0
+        release.set()
+        events = list(stream)
+        assert events[-1]["event"] == "done"
+        assert events[-1]["path"][:len(first["moves"])] == first["moves"]
+
+    def test_held_karp_progress_and_cancelling(self):
+        """Test that held-karp's DP reports progress, and stops when the stream is closed."""
+        world = make_random_world(0, 20, 20, 0.2, 12)
+        stream = world.search_stream("held-karp", progress_every=1000)
+        first = next(stream)
+        assert first["event"] == "progress" and first["nodes_expanded"] >= 1000
+        stream.close()
+
+    def test_progress_snapshots(self):
+        """Test that progress snapshots come every progress_every expansions, with a rising lower bound."""
+        world = load_world("random-20x5.txt")
+        snapshots = [event for event in world.search_stream("uniform-cost", progress_every=10)
+                     if event["event"] == "progress"]
+        assert snapshots
+        assert all(snapshot["nodes_expanded"] % 10 == 0 for snapshot in snapshots)
+        bounds = [snapshot["bound"] for snapshot in snapshots]
+        assert bounds == sorted(bounds) and bounds[-1] <= OPTIMAL_LENGTHS["random-20x5.txt"]
+
+    def test_fleet_progress(self):
+        """Test that a fleet's progress adds up across its robots, in this process and on a pool."""
+        world = World("9\n3\n@__*___*@\n_________\n*_______*")
+        for workers in (1, 2):
+            events = list(world.search_stream("uniform-cost", workers=workers, progress_every=5))
+            expanded = [event["nodes_expanded"] for event in events if event["event"] == "progress"]
+            assert expanded and expanded == sorted(expanded)
+            assert expanded[-1] <= events[-1]["nodes_expanded"]
+
+    def test_fleet_legs(self):
+        """Test that each robot's legs are streamed under its own index."""
+        world = World("5\n1\n*@_@*")
+        events = list(world.search_stream("a-star", workers=1))
+        robots = {event["robot"] for event in events if event["event"] == "leg"}
+        assert robots == {0, 1}
+
+    def test_errors_are_raised(self):
+        """Test that a failing search raises out of the stream."""
+        with pytest.raises(ValueError):
+            list(World("3\n1\n@#*").search_stream("a-star"))
+
+
+class TestFleet:
+    """Test suite for planning with several robots."""
+
+    @staticmethod
+    def replay_fleet(world: World, paths: list[list[str]]) -> set[tuple[int, int]]:
+        """Execute every robot's plan and return the dirty cells left behind."""
+        dirt = set(world.dirty_cells)
+        for robot, moves in zip(world.get_bot_positions(), paths):
+            pos = robot
+            for move in moves:
+                if move == "V":
+                    assert pos in dirt, f"Vacuumed a clean cell at {pos}"
+                    dirt.remove(pos)
+                else:
+                    pos = (pos[0] + offset_map[move][0], pos[1] + offset_map[move][1])
+                    assert world.is_open(pos), f"Moved into a blocked cell at {pos}"
+        return dirt
+
+    def test_partition_balances_makespan(self):
+        """Test that robots at opposite ends each take the dirt near them."""
+        world = World("9\n3\n@__*___*@\n_________\n*_______*")
+        output = world.search("held-karp", workers=1)
+        assert self.replay_fleet(world, output["paths"]) == set()
+        assert output["makespan"] == max(map(len, output["paths"])) == 9
+        assert not output["optimal"]
+
+    def test_process_pool(self):
+        """Test that solving the robots in worker processes gives the same plans."""
+        world = World("9\n3\n@__*___*@\n_________\n*_______*")
+        assert world.search("a-star", workers=2)["paths"] == world.search("a-star", workers=1)["paths"]
+
+    def test_stats_are_totaled(self):
+        """Test that the robots' stats are added up into the passed stats and returned under "stats"."""
+        world = World("9\n3\n@__*___*@\n_________\n*_______*")
+        stats = SearchStats()
+        output = world.search("uniform-cost", workers=1, stats=stats)
+        assert stats.nodes_expanded == output["nodes_expanded"] == output["stats"]["nodes_expanded"]
+        assert output["stats"]["nodes_generated"] == sum(robot["nodes_generated"] for robot in output["robot_stats"])
+
+    def test_idle_robot(self):
+        """Test that a robot with no dirt assigned stays put."""
+        world = World("5\n1\n@*__@")
+        assert world.search("uniform-cost", workers=1)["paths"] == [["E", "V"], []]
+
+    def test_single_robot_outputs(self):
+        """Test that one robot gets the fleet keys too."""
+        output = load_world("random-5x7.txt").search("a-star")
+        assert output["paths"] == [output["path"]]
+        assert output["makespan"] == len(output["path"])
+
+    def test_unreachable_dirt(self):
+        """Test that dirt no robot can reach raises an error."""
+        with pytest.raises(ValueError):
+            World("5\n1\n@#*#@").search("a-star", workers=1)
+
+
+class TestAgent:
+    """Test suite for the Agent's persistent path."""
+
+    def test_visited_cells_are_not_children(self):
+        """Test that expansion skips cells already on the path."""
+        world = World("3\n2\n@_*\n___")
+        agent = Agent(world, world.get_bot_pos_from_grid())
+        agent.expand_children()
+        agent.execute_action(next(act for act in agent.tree_node.available_acts if act.act_type == "E"))
+        agent.expand_children()
+        assert (0, 0) in agent.path
+        assert {act.end_state.pos for act in agent.tree_node.available_acts} == {(0, 2), (1, 1)}
+
+    def test_move_seq_and_backtrack(self):
+        """Test that backtracking is recorded and the branch is pruned."""
+        world = World("3\n1\n@_*")
+        agent = Agent(world, (0, 0))
+        agent.expand_children()
+        agent.execute_action(agent.tree_node.available_acts[0])
+        agent.backtrack()
+        assert agent.pos == (0, 0)
+        assert agent.move_seq == ["E", "W"]
+        assert list(agent.path) == [(0, 0), (0, 1)]
+        assert agent.tree_node.available_acts == []
+
+    def test_branches_share_prefix(self):
+        """Test that branched agents share their common path without affecting each other."""
+        world = World("3\n2\n@_*\n___")
+        agent = Agent(world, (0, 0))
+        agent.expand_children()
+        east, south = agent.branch(), agent.branch()
+        east.execute_action(next(act for act in agent.tree_node.available_acts if act.act_type == "E"))
+        south.execute_action(next(act for act in agent.tree_node.available_acts if act.act_type == "S"))
+        assert east.path.parent is south.path.parent
+        assert (east.pos, south.pos) == ((0, 1), (1, 0))
+        assert east.move_seq == ["E"] and south.move_seq == ["S"]
+        assert agent.move_seq == []
+
+    def test_path_membership(self):
+        """Test visited checks on a large map, off the grid, and across diverging branches."""
+        root = AgentPath(1000, 1000)
+        cells = [(r, (r * 7919) % 1000) for r in range(0, 1000, 3)]
+        path = root
+        for cell in cells:
+            path = path.push("E", cell)
+        assert all(cell in path for cell in cells)
+        assert (1, 1) not in path and (-1, 0) not in path and (0, -1) not in path and (1000, 0) not in path
+        left, right = path.push("W", (999, 999)), path.push("E", (998, 998))
+        assert (999, 999) in left and (999, 999) not in right
+        assert (998, 998) in right and (998, 998) not in left and (998, 998) not in path
+        assert len(left) == len(right) == len(cells) + 1
+
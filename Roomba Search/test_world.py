@@ -0,0 +1,163 @@
+import os
+import pytest
+import numpy as np
+from Grid import Grid
+from World import World
+from WorldModel import WorldModel
+from config import offset_map
+from DistanceOracle import DistanceOracle
+from make_vacuum_world import generate_corpus, get_reachable_mask
+
+
+class TestGrid:
+    """Test suite for the array-backed grid."""
+
+    def test_parses_into_masks(self):
+        """Test that parsing fills the cell codes and both masks."""
+        world = World("4\n2\n@#*_\r\n_*#_\r")
+        assert world.grid.cells.dtype == np.uint8
+        assert world.grid.shape == (2, 4)
+        assert world.obstacle_mask.tolist() == [[False, True, False, False], [False, False, True, False]]
+        assert world.dirt_mask.tolist() == [[False, False, True, False], [False, True, False, False]]
+        assert world.dirty_cells == {(0, 2), (1, 1)}
+        assert world.get_bot_pos_from_grid() == (0, 0)
+
+    def test_list_compatible_access(self):
+        """Test that grid[r][c] reads and writes characters like a list of lists."""
+        world = World("3\n1\n@_*")
+        assert world.grid[0][2] == "*"
+        assert list(world.grid[0]) == ["@", "_", "*"]
+        world.remove_dirty_cell((0, 2))
+        assert world.grid[0][2] == "_"
+        assert not world.dirt_mask.any()
+
+    def test_accepts_list_grids(self):
+        """Test that list-of-lists grids are converted."""
+        model = WorldModel([list("@#"), list("*_")], {(1, 0)})
+        assert isinstance(model.grid, Grid)
+        assert (model.num_rows, model.num_cols) == (2, 2)
+        assert not model.is_open((0, 1))
+        assert not model.is_open((2, 0))
+
+    def test_rejects_short_rows(self):
+        """Test that rows shorter than the header's width are rejected."""
+        with pytest.raises(ValueError):
+            World("4\n2\n@_*_\n__")
+        with pytest.raises(ValueError):
+            World("4\n3\n@_*_\n____")
+
+
+class TestNeighborTable:
+    """Test suite for the precomputed neighbor table."""
+
+    def test_matches_legality_checks(self):
+        """Test that the table lists exactly the moves onto open, in-bounds cells."""
+        world = World("4\n3\n@#*_\n_*#_\n__#*")
+        table = world.get_neighbor_table()
+        for row in range(world.num_rows):
+            for col in range(world.num_cols):
+                expected = set()
+                if world.is_open((row, col)):
+                    for move, (dr, dc) in offset_map.items():
+                        if world.is_open((row + dr, col + dc)):
+                            expected.add((move, (row + dr, col + dc)))
+                assert set(table.get_neighbors((row, col))) == expected
+
+    def test_rebuilt_when_obstacles_change(self):
+        """Test that the cached table is replaced after an obstacle is added."""
+        world = World("3\n1\n@_*")
+        table = world.get_neighbor_table()
+        assert world.get_neighbor_table() is table
+        world.grid[0][1] = "#"
+        assert world.get_neighbor_table() is not table
+        assert world.get_neighbor_table().get_neighbors((0, 0)) == ()
+
+
+class TestWorldLoader:
+    """Test suite for the memory-mapped world loader."""
+
+    ROWS = ["@#*_", "_*#_"]
+
+    def write(self, tmp_path, data: bytes) -> str:
+        world_file = str(tmp_path / "world.txt")
+        with open(world_file, "wb") as file:
+            file.write(data)
+        return world_file
+
+    @pytest.mark.parametrize("encoding", ["utf-16", "utf-16-le", "utf-16-be", "utf-8-sig", "ascii"])
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    def test_detects_encodings(self, tmp_path, encoding, newline):
+        """Test that every supported encoding and line ending loads the same world."""
+        text = newline.join(["4", "2"] + self.ROWS) + newline
+        world = World.load(self.write(tmp_path, text.encode(encoding)))
+        assert world.grid.to_rows() == self.ROWS
+        assert world.dirty_cells == {(0, 2), (1, 1)}
+        assert world.get_bot_pos_from_grid() == (0, 0)
+
+    def test_sample_maps_match_text_parser(self):
+        """Test that loading a sample map matches parsing its decoded text."""
+        world_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "random-11x6.txt")
+        with open(world_file, 'r', encoding='utf-16') as file:
+            expected = World(file.read().strip())
+        world = World.load(world_file)
+        assert world.grid.to_rows() == expected.grid.to_rows()
+        assert world.dirty_cells == expected.dirty_cells
+
+    @pytest.mark.parametrize("text", [
+        "4\n3\n@#*_\n_*#_\n",
+        "4\n2\n@#*_\n_*#_\n____\n",
+        "4\n2\n@#*_\n_*#\n",
+        "4\n2\n@#*__\n_*#_\n",
+        "four\n2\n@#*_\n_*#_\n",
+        "4\n",
+    ])
+    def test_validates_header(self, tmp_path, text):
+        """Test that rows that don't match the header's dimensions are rejected."""
+        with pytest.raises(ValueError):
+            World.load(self.write(tmp_path, text.encode("utf-16")))
+
+    def test_mixed_line_endings(self, tmp_path):
+        """Test that rows may end in CRLF or LF, and trailing blank lines are ignored."""
+        world = World.load(self.write(tmp_path, b"4\r\n2\n@#*_\r\n_*#_\n\r\n  \n"))
+        assert world.grid.to_rows() == self.ROWS
+
+    def test_carriage_return_inside_row(self, tmp_path):
+        """Test that a carriage return is only dropped at the end of a row."""
+        with pytest.raises(ValueError):
+            World.load(self.write(tmp_path, b"4\n2\n@#\r*_\n_*#_\n"))
+
+    def test_rejects_non_ascii(self, tmp_path):
+        """Test that characters outside ASCII are rejected."""
+        with pytest.raises(ValueError):
+            World.load(self.write(tmp_path, "2\n1\n@é\n".encode("utf-16")))
+
+
+class TestGenerator:
+    """Test suite for the seeded bulk map generator."""
+
+    def test_corpus_is_reproducible(self, tmp_path):
+        """Test that the same seed writes the same maps, whatever the corpus size."""
+        generate_corpus(str(tmp_path / "a"), 3, 20, 30, 0.2, 4, seed=7)
+        generate_corpus(str(tmp_path / "b"), 2, 20, 30, 0.2, 4, seed=7)
+        for name in ["map-00000.txt", "map-00001.txt"]:
+            assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+        assert (tmp_path / "a" / "map-00000.txt").read_bytes() != (tmp_path / "a" / "map-00001.txt").read_bytes()
+
+    @pytest.mark.parametrize("reachability", ["reject", "repair"])
+    def test_every_dirty_cell_is_reachable(self, tmp_path, reachability):
+        """Test that checked maps never strand dirt behind obstacles."""
+        manifest = generate_corpus(str(tmp_path), 10, 15, 15, 0.4, 5, seed=3, reachability=reachability)
+        assert len(manifest["maps"]) == 10
+        for entry in manifest["maps"]:
+            world = World.load(str(tmp_path / entry["file"]))
+            assert len(world.dirty_cells) == entry["num_dirty"] == 5
+            oracle = DistanceOracle(world)
+            assert all(oracle.distance(oracle.start, pos) < float("inf") for pos in oracle.dirt_cells)
+
+    def test_reachable_mask(self):
+        """Test the flood fill around a wall."""
+        obstacles = np.array([[False, True, False], [False, True, False], [False, False, False]])
+        assert get_reachable_mask(obstacles, (0, 0)).tolist()\
+            == [[True, False, True], [True, False, True], [True, True, True]]
+        obstacles[2, 1] = True
+        assert get_reachable_mask(obstacles, (0, 0)).sum() == 3
@@ -0,0 +1,91 @@
+import numpy as np
+
+# distance of cells no source can reach
+UNREACHED = -1
+
+def get_neighbor_indices(frontier: np.ndarray, rows: int, cols: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the flat indices of every in-bounds neighbor of the frontier cells, along with the
+    position in the frontier each one was reached from. Indices past rows * cols address
+    further layers of the same size, which never reach into each other.
+    """
+    cell = frontier % (rows * cols)
+    frontier_cols = cell % cols
+    steps = (
+        (cell >= cols, -cols),
+        (cell < (rows - 1) * cols, cols),
+        (frontier_cols > 0, -1),
+        (frontier_cols < cols - 1, 1)
+    )
+    parents = np.concatenate([np.flatnonzero(valid) for valid, _ in steps])
+    neighbors = np.concatenate([frontier[valid] + step for valid, step in steps])
+    return neighbors, parents
+
+
+def check_sources(obstacle_mask: np.ndarray, sources: list[tuple[int, int]]) -> np.ndarray:
+    rows, cols = obstacle_mask.shape
+    for pos in sources:
+        if not (0 <= pos[0] < rows and 0 <= pos[1] < cols) or obstacle_mask[pos]:
+            raise ValueError(f"Source {pos} is blocked or off the grid.")
+    return np.array([pos[0] * cols + pos[1] for pos in sources], dtype=np.int64)
+
+
+def spread(is_open: np.ndarray, frontier: np.ndarray, rows: int, cols: int,
+           labels: np.ndarray | None = None) -> np.ndarray:
+    """
+    Run the BFS wavefront out from the frontier over the open cells, one whole level per step.
+    Returns each cell's distance, and fills in labels (if given) with the label of the cell it was reached from.
+    """
+    distances = np.full(len(is_open), UNREACHED, dtype=np.int32)
+    distances[frontier] = 0
+    # scratch space for removing duplicate candidates without sorting them
+    owner = np.empty(len(is_open), dtype=np.int64)
+    level = 0
+    while len(frontier):
+        level += 1
+        candidates, parents = get_neighbor_indices(frontier, rows, cols)
+        fresh = is_open[candidates] & (distances[candidates] == UNREACHED)
+        candidates, parents = candidates[fresh], parents[fresh]
+        # when several frontier cells reach the same cell, the last one written wins
+        order = np.arange(len(candidates))
+        owner[candidates] = order
+        unique = owner[candidates] == order
+        candidates = candidates[unique]
+        distances[candidates] = level
+        if labels is not None:
+            labels[candidates] = labels[frontier[parents[unique]]]
+        frontier = candidates
+    return distances
+
+
+def wavefront_bfs(obstacle_mask: np.ndarray,
+                  sources: list[tuple[int, int]],
+                  return_labels: bool = False) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+    """
+    Get every cell's distance to the nearest of the sources, as an array shaped like the obstacle
+    mask with UNREACHED for cells no source can reach. Each step expands the whole frontier at once
+    with array operations, so the cost is O(cells) plus a small overhead per BFS level.
+    If return_labels is set, the index of the nearest source (or UNREACHED) is returned too.
+    """
+    rows, cols = obstacle_mask.shape
+    frontier = check_sources(obstacle_mask, sources)
+    labels = None
+    if return_labels:
+        labels = np.full(rows * cols, UNREACHED, dtype=np.int32)
+        # a source listed twice keeps its first index
+        labels[frontier[::-1]] = np.arange(len(sources), dtype=np.int32)[::-1]
+    distances = spread(~obstacle_mask.ravel(), np.unique(frontier), rows, cols, labels)
+    if return_labels:
+        return distances.reshape(rows, cols), labels.reshape(rows, cols)
+    return distances.reshape(rows, cols)
+
+
+def distance_fields(obstacle_mask: np.ndarray, sources: list[tuple[int, int]]) -> np.ndarray:
+    """
+    Get a separate distance field for each source, shaped (sources, rows, cols). All of the fields
+    are grown in the same wavefront, one layer per source, so there is only one loop over BFS levels.
+    """
+    rows, cols = obstacle_mask.shape
+    starts = check_sources(obstacle_mask, sources) + np.arange(len(sources)) * rows * cols
+    is_open = np.tile(~obstacle_mask.ravel(), len(sources))
+    return spread(is_open, starts, rows, cols).reshape(len(sources), rows, cols)
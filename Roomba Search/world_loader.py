@@ -0,0 +1,157 @@
+import os
+import mmap
+import codecs
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from Grid import Grid
+
+NEWLINE = ord("\n")
+CARRIAGE_RETURN = ord("\r")
+WHITESPACE = np.array([ord(" "), ord("\t"), NEWLINE, CARRIAGE_RETURN], dtype=np.uint8)
+# the column and row counts are always within this many characters of the start
+HEADER_LENGTH = 64
+
+def detect_encoding(head: bytes) -> tuple[str, int]:
+    """
+    Detect a world file's encoding from its first bytes, returning the encoding and the length of its BOM.
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8", len(codecs.BOM_UTF8)
+    if head.startswith(codecs.BOM_UTF16_LE):
+        return "utf-16-le", len(codecs.BOM_UTF16_LE)
+    if head.startswith(codecs.BOM_UTF16_BE):
+        return "utf-16-be", len(codecs.BOM_UTF16_BE)
+    # without a BOM, ASCII text in UTF-16 still shows up as every other byte being 0
+    if len(head) >= 2 and head[0] != 0 and head[1] == 0:
+        return "utf-16-le", 0
+    if len(head) >= 2 and head[0] == 0 and head[1] != 0:
+        return "utf-16-be", 0
+    return "utf-8", 0
+
+
+def get_char_codes(raw: np.ndarray, encoding: str) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Get views with one code per character, without copying the encoded bytes. Map files only
+    ever contain ASCII, so UTF-16 can be decoded by viewing every other byte; the other bytes
+    are returned too, so the caller can check they are all zero.
+    """
+    if encoding == "utf-8":
+        return raw, None
+    # an odd length means the file ends in the middle of a character
+    if len(raw) % 2:
+        raise ValueError("World file ends in the middle of a UTF-16 character.")
+    low, high = (raw[0::2], raw[1::2]) if encoding == "utf-16-le" else (raw[1::2], raw[0::2])
+    return low, high
+
+
+def parse_header(codes: np.ndarray) -> tuple[int, int, int]:
+    """
+    Read the number of columns and rows, returning them along with where the first row starts.
+    """
+    lines = codes[:HEADER_LENGTH].tobytes().split(b"\n", 2)
+    if len(lines) < 3:
+        raise ValueError("World file is missing its column and row counts.")
+    try:
+        num_cols = int(lines[0])
+        num_rows = int(lines[1])
+    except ValueError:
+        raise ValueError("World file's column and row counts must be integers.")
+    return num_cols, num_rows, len(lines[0]) + len(lines[1]) + 2
+
+
+def is_blank(codes: np.ndarray) -> bool:
+    return bool(np.isin(codes, WHITESPACE).all())
+
+
+def find_newline(codes: np.ndarray, pos: int, window: int) -> int:
+    """
+    Find the first newline at or after pos, or the end of the codes, searching a window at a time.
+    """
+    while pos < len(codes):
+        hits = np.flatnonzero(codes[pos:pos + window] == NEWLINE)
+        if len(hits):
+            return pos + int(hits[0])
+        pos += window
+        window *= 2
+    return len(codes)
+
+
+def copy_rows(codes: np.ndarray, start: int, cells: np.ndarray) -> int:
+    """
+    Copy the rows starting at start into cells, checking each one is exactly as wide as cells.
+    A carriage return is only dropped right before a newline. Returns where the last row's cells end.
+    """
+    num_rows, num_cols = cells.shape
+    if num_rows == 0:
+        return start
+
+    # when every row ends the same way as the first, the rows sit at a fixed stride,
+    # so only the line endings need checking before copying them all at once
+    crlf = start + num_cols < len(codes) and codes[start + num_cols] == CARRIAGE_RETURN
+    stride = num_cols + 1 + crlf
+    last_end = start + (num_rows - 1) * stride + num_cols
+    if last_end <= len(codes):
+        line_ends = start + np.arange(1, num_rows) * stride - 1
+        rows = as_strided(codes[start:], shape=(num_rows, num_cols), strides=(stride * codes.strides[0], codes.strides[0]),
+                          writeable=False)
+        if (codes[line_ends] == NEWLINE).all() and (not crlf or (codes[line_ends - 1] == CARRIAGE_RETURN).all()):
+            cells[:] = rows
+            if not (cells == NEWLINE).any():
+                return last_end
+
+    # otherwise walk the rows one at a time, to allow mixed line endings or say which row is wrong
+    pos = start
+    for row in range(num_rows):
+        newline = find_newline(codes, pos, num_cols + 2)
+        end = newline - 1 if newline > pos and codes[newline - 1] == CARRIAGE_RETURN else newline
+        if end - pos != num_cols:
+            if is_blank(codes[pos:]):
+                raise ValueError(f"Header says {num_rows} rows, found {row}.")
+            raise ValueError(f"Row {row} has {end - pos} cells, header says {num_cols}.")
+        cells[row] = codes[pos:end]
+        pos = newline + 1
+    return end
+
+
+def parse_grid(codes: np.ndarray, high: np.ndarray | None = None) -> Grid:
+    """
+    Parse a world from ASCII codes: the number of columns, the number of rows, then one line per row.
+    The rows are checked against the header's dimensions and copied straight into the grid's array,
+    so nothing bigger than the grid is allocated. For UTF-16, high holds every character's other byte.
+    """
+    num_cols, num_rows, start = parse_header(codes)
+    cells = np.empty((num_rows, num_cols), dtype=np.uint8)
+    end = copy_rows(codes, start, cells)
+
+    # ignore trailing blank lines and whitespace
+    tail = codes[end:]
+    if not is_blank(tail):
+        extra_rows = sum(1 for line in tail.tobytes().split(b"\n") if line.strip())
+        raise ValueError(f"Header says {num_rows} rows, found {num_rows + extra_rows}.")
+    if (cells.size and cells.max() >= 128) or (high is not None and len(high) and high.max() != 0):
+        raise ValueError("World file may only contain ASCII characters.")
+    return Grid(cells)
+
+
+def read_grid(world_file: str) -> Grid:
+    """
+    Memory-map a world file and parse it into a grid, detecting UTF-16 (with or without a BOM),
+    UTF-8 or plain ASCII. The rows are decoded straight from the map into the grid.
+    """
+    with open(world_file, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise ValueError(f"World file {world_file} is empty.")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            raw = np.frombuffer(mapped, dtype=np.uint8)
+            encoding, bom_length = detect_encoding(raw[:4].tobytes())
+            # the map can't be closed while an exception's traceback still holds views of it,
+            # so only the message is kept until then
+            try:
+                grid, error = parse_grid(*get_char_codes(raw[bom_length:], encoding)), None
+            except ValueError as e:
+                grid, error = None, str(e)
+            del raw
+    if error is not None:
+        raise ValueError(f"World file {world_file}: {error}")
+    return grid